@@ -0,0 +1,74 @@
+import importlib.util
+import logging
+import httpx
+
+from ..config import Settings
+from ..metrics import MetricsTransport, upstream_key
+from .jellyfin import JellyfinClient
+from .jellyseerr import JellyseerrClient
+from .tmdb import TMDB_API_URL, TMDBClient
+
+logger = logging.getLogger(__name__)
+
+def create_http_client(settings: Settings) -> httpx.AsyncClient:
+    """
+    Create the pooled HTTP client shared by every upstream API client.
+    Requests are timed per upstream for the metrics.
+    """
+    http2 = settings.HTTP2_ENABLED
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the h2 package is not installed, using HTTP/1.1")
+        http2 = False
+
+    # With a custom transport, pool settings go on the transport rather than the client
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        ),
+        http2=http2
+    )
+    upstreams = {
+        upstream_key(settings.JELLYFIN_URL): "jellyfin",
+        upstream_key(settings.JELLYSEERR_URL): "jellyseerr",
+        upstream_key(TMDB_API_URL): "tmdb",
+    }
+
+    return httpx.AsyncClient(
+        transport=MetricsTransport(transport, upstreams),
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT)
+    )
+
+class ApiClients:
+    """
+    Jellyfin, Jellyseerr and TMDB clients sharing one pooled HTTP client.
+    Created once by the app and closed on shutdown.
+    """
+    def __init__(self, settings: Settings, http_client: httpx.AsyncClient | None = None):
+        self.http = http_client or create_http_client(settings)
+
+        self.jellyfin = JellyfinClient(
+            base_url=settings.JELLYFIN_URL,
+            api_key=settings.JELLYFIN_API_KEY,
+            page_size=settings.JELLYFIN_PAGE_SIZE,
+            http_client=self.http
+        )
+        self.jellyseerr = JellyseerrClient(
+            base_url=settings.JELLYSEERR_URL,
+            api_key=settings.JELLYSEERR_API_KEY,
+            page_size=settings.JELLYSEERR_PAGE_SIZE,
+            page_concurrency=settings.JELLYSEERR_PAGE_CONCURRENCY,
+            http_client=self.http
+        )
+        self.tmdb = TMDBClient(
+            api_key=settings.TMDB_API_KEY,
+            http_client=self.http,
+            rate_limit=settings.TMDB_RATE_LIMIT,
+            max_concurrency=settings.TMDB_MAX_CONCURRENCY,
+            max_retries=settings.TMDB_MAX_RETRIES
+        )
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client and its pooled connections"""
+        await self.http.aclose()
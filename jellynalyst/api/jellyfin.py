@@ -1,9 +1,11 @@
-from typing import List
+from typing import Any, AsyncIterator, Dict, List
 from pydantic import BaseModel
 import httpx
 from datetime import datetime
 import logging
 
+from ..sync_stats import phase
+
 class JellyfinUser(BaseModel):
     """Model for Jellyfin API response, matching database schema"""
     id: int
@@ -17,41 +19,68 @@ class JellyfinUser(BaseModel):
     class Config:
             from_attributes = True
 
-class JellyfinWatchItem(BaseModel):
-    """Model for Jellyfin watch history item response"""
+class JellyfinLibraryItem(BaseModel):
+    """Model for Jellyfin library item metadata, the same for every user"""
     item_id: str
     item_name: str
     item_type: str
+    series_id: str | None = None  # Set for episodes
+    series_name: str | None = None
     tmdb_id: int | None
     imdb_id: str | None
     genres: List[str] | None
+    runtime_ticks: int | None
+    production_year: int | None
+
+class JellyfinWatchItem(BaseModel):
+    """Model for a user's play state of a Jellyfin item"""
+    item_id: str
+    item_name: str
+    item_type: str
     played_percentage: float | None
     play_count: int
     last_played_date: datetime | None
     is_played: bool
-    runtime_ticks: int | None
-    production_year: int | None
 
 logger = logging.getLogger(__name__)
 
+# Only the extra fields JellyfinLibraryItem reads. Id, Name, Type, SeriesId,
+# SeriesName, RunTimeTicks and ProductionYear are part of the base item response.
+LIBRARY_ITEM_FIELDS = "Genres,ProviderIds"
+
+# Watch history only needs UserData, so per-user queries ask for no extra fields
+
+# Items without either of these have never been played by the user
+PLAYED_FILTERS = ("IsPlayed", "IsResumable")
+
 class JellyfinClient:
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        page_size: int = 500,
+        http_client: httpx.AsyncClient | None = None
+    ):
         self.base_url = base_url.rstrip("/")
         self.headers = {"X-MediaBrowser-Token": api_key}
+        self.page_size = page_size
+        # Long-lived so connections are kept alive between calls
+        self.http = http_client or httpx.AsyncClient()
 
     async def get_users(self) -> List[JellyfinUser]:
         """Get all users from Jellyfin"""
         logger.debug(f"Making request to Jellyfin API: {self.base_url}/Users")
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        with phase("fetch"):
+            response = await self.http.get(
                 f"{self.base_url}/Users",
                 headers=self.headers
             )
             response.raise_for_status()
             data = response.json()
-            logger.debug(f"Raw user data from Jellyfin: {data}")
-            users = []
-            for user in response.json():
+        logger.debug(f"Raw user data from Jellyfin: {data}")
+        users = []
+        with phase("parse"):
+            for user in data:
                 users.append(JellyfinUser(
                     id=0,  # This will be assigned by the database
                     jellyfin_id=user["Id"],
@@ -61,57 +90,216 @@ class JellyfinClient:
                     last_login=user.get("LastLoginDate", datetime.utcnow()),
                     last_seen=user.get("LastActivityDate", datetime.utcnow())
                 ))
-            return users
+        return users
+
+    async def iter_watch_history(
+        self,
+        user_id: str,
+        min_date_saved: datetime | None = None
+    ) -> AsyncIterator[List[JellyfinWatchItem]]:
+        """
+        Yield watch history for a user from Jellyfin one page at a time,
+        so that memory stays bounded by the page size and not the library size.
+        If min_date_saved is set, only items whose user data changed since then are returned.
+        """
+        params = {
+            "SortBy": "DatePlayed",
+            "SortOrder": "Descending",
+            "EnableUserData": "true",
+            "EnableImages": "false",
+            "IncludeItemTypes": "Movie,Episode",
+            "Recursive": "true",
+        }
+
+        if min_date_saved is not None:
+            # Incremental passes apply no played filters and rely on MinDateLastSavedForUser alone
+            params["MinDateLastSavedForUser"] = min_date_saved.isoformat()
+            filter_passes: List[str | None] = [None]
+        else:
+            # Jellyfin ANDs item filters, so each played filter gets its own pass
+            filter_passes = list(PLAYED_FILTERS)
+
+        for item_filter in filter_passes:
+            pass_params = {**params, "Filters": item_filter} if item_filter else params
+            async for items in self._iter_pages(f"/Users/{user_id}/Items", pass_params):
+                with phase("parse"):
+                    page = [self._parse_watch_item(item) for item in items]
+                yield page
+
+    async def iter_library_items(
+        self,
+        min_date_saved: datetime | None = None
+    ) -> AsyncIterator[List[JellyfinLibraryItem]]:
+        """
+        Yield library-wide item metadata one page at a time.
+        If min_date_saved is set, only items saved since then are returned.
+        """
+        params = {
+            "SortBy": "SortName",
+            "EnableImages": "false",
+            "IncludeItemTypes": "Movie,Episode",
+            "Recursive": "true",
+            "Fields": LIBRARY_ITEM_FIELDS,
+        }
+        if min_date_saved is not None:
+            params["MinDateLastSaved"] = min_date_saved.isoformat()
+
+        async for items in self._iter_pages("/Items", params):
+            with phase("parse"):
+                page = [self._parse_library_item(item) for item in items]
+            yield page
+
+    async def get_library_items(self, item_ids: List[str]) -> List[JellyfinLibraryItem]:
+        """
+        Get item metadata for specific items
+        """
+        library_items: List[JellyfinLibraryItem] = []
+        # Keep the query string a reasonable length
+        for offset in range(0, len(item_ids), 100):
+            with phase("fetch"):
+                response = await self.http.get(
+                    f"{self.base_url}/Items",
+                    headers=self.headers,
+                    params={
+                        "Ids": ",".join(item_ids[offset:offset + 100]),
+                        "Fields": LIBRARY_ITEM_FIELDS,
+                        "EnableImages": "false"
+                    }
+                )
+                response.raise_for_status()
+                items = response.json().get("Items", [])
+            with phase("parse"):
+                library_items.extend(self._parse_library_item(item) for item in items)
+
+        return library_items
 
-    async def get_watch_history(self, user_id: str) -> List[JellyfinWatchItem]:
+    async def get_watch_items(self, user_id: str, item_ids: List[str]) -> List[JellyfinWatchItem]:
         """
-        Get watch history for a user from Jellyfin
+        Get a user's play state for specific items
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/Users/{user_id}/Items",
+        watch_items: List[JellyfinWatchItem] = []
+        # Keep the query string a reasonable length
+        for offset in range(0, len(item_ids), 100):
+            with phase("fetch"):
+                response = await self.http.get(
+                    f"{self.base_url}/Users/{user_id}/Items",
+                    headers=self.headers,
+                    params={
+                        "Ids": ",".join(item_ids[offset:offset + 100]),
+                        "EnableUserData": "true",
+                        "EnableImages": "false"
+                    }
+                )
+                response.raise_for_status()
+                items = response.json().get("Items", [])
+            with phase("parse"):
+                watch_items.extend(self._parse_watch_item(item) for item in items)
+
+        return watch_items
+
+    async def _iter_pages(
+        self,
+        path: str,
+        params: Dict[str, Any]
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Walk a Jellyfin item query with StartIndex/Limit and yield the raw items of each page
+        """
+        start_index = 0
+        while True:
+            with phase("fetch"):
+                response = await self.http.get(
+                    f"{self.base_url}{path}",
+                    headers=self.headers,
+                    params={**params, "StartIndex": start_index, "Limit": self.page_size}
+                )
+                response.raise_for_status()
+                data = response.json()
+
+            items = data.get("Items", [])
+            if not items:
+                break
+
+            logger.debug(f"Fetched page of {len(items)} items at index {start_index} from {path}")
+            yield items
+
+            start_index += len(items)
+            if start_index >= data.get("TotalRecordCount", 0):
+                break
+
+    async def get_series_tmdb_ids(self, series_ids: List[str]) -> Dict[str, int | None]:
+        """
+        Get the TMDB id of each series, None if Jellyfin doesn't know it
+        """
+        tmdb_ids: Dict[str, int | None] = {}
+        # Keep the query string a reasonable length
+        for offset in range(0, len(series_ids), 100):
+            response = await self.http.get(
+                f"{self.base_url}/Items",
                 headers=self.headers,
                 params={
-                    "SortBy": "DatePlayed",
-                    "SortOrder": "Descending",
-                    "EnableUserData": "true",
-                    "IncludeItemTypes": "Movie,Episode",
-                    "Recursive": "true",
-                    "Fields": "DateCreated,Path,Genres,MediaStreams,Overview,ProviderIds,UserData"
+                    "Ids": ",".join(series_ids[offset:offset + 100]),
+                    "Fields": "ProviderIds",
+                    "EnableImages": "false"
                 }
             )
             response.raise_for_status()
-            data = response.json()
 
-            watch_items: List[JellyfinWatchItem] = []
-
-            for item in data.get("Items", []):
-                # Default values
-                tmdb_id = None
-                provider_ids = item.get("ProviderIds", {})
-                user_data = item.get("UserData", {})
-
-                # Try to get TMDB ID
-                if tmdb_str := provider_ids.get("Tmdb"):
-                    try:
-                        tmdb_id = int(tmdb_str)
-                    except (ValueError, TypeError):
-                        pass
-
-                watch_item = JellyfinWatchItem(
-                    item_id=item["Id"],
-                    item_name=item["Name"],
-                    item_type=item["Type"],
-                    tmdb_id=tmdb_id,
-                    imdb_id=provider_ids.get("Imdb"),
-                    genres=item.get("Genres", []),
-                    played_percentage=user_data.get("PlayedPercentage"),
-                    play_count=user_data.get("PlayCount", 0),
-                    last_played_date=user_data.get("LastPlayedDate"),
-                    is_played=user_data.get("Played", False),
-                    runtime_ticks=item.get("RunTimeTicks"),
-                    production_year=item.get("ProductionYear")
-                )
-                watch_items.append(watch_item)
+            for item in response.json().get("Items", []):
+                tmdb_ids[item["Id"]] = self._parse_tmdb_id(item.get("ProviderIds", {}))
+
+        return tmdb_ids
+
+    def _parse_tmdb_id(self, provider_ids: Dict[str, Any]) -> int | None:
+        """
+        Get the TMDB id from an item's ProviderIds
+        """
+        if tmdb_str := provider_ids.get("Tmdb"):
+            try:
+                return int(tmdb_str)
+            except (ValueError, TypeError):
+                pass
+        return None
+
+    def _parse_library_item(self, item: Dict[str, Any]) -> JellyfinLibraryItem:
+        """
+        Build a library item from a raw Jellyfin item
+        """
+        provider_ids = item.get("ProviderIds", {})
+
+        # For episodes this is the episode's own id, which JellyfinService
+        # swaps for the series id before enrichment
+        tmdb_id = self._parse_tmdb_id(provider_ids)
+
+        return JellyfinLibraryItem(
+            item_id=item["Id"],
+            item_name=item["Name"],
+            item_type=item["Type"],
+            series_id=item.get("SeriesId"),
+            series_name=item.get("SeriesName"),
+            tmdb_id=tmdb_id,
+            imdb_id=provider_ids.get("Imdb"),
+            genres=item.get("Genres", []),
+            runtime_ticks=item.get("RunTimeTicks"),
+            production_year=item.get("ProductionYear")
+        )
+
+    def _parse_watch_item(self, item: Dict[str, Any]) -> JellyfinWatchItem:
+        """
+        Build a watch item from a raw Jellyfin item
+        """
+        user_data = item.get("UserData", {})
+
+        return JellyfinWatchItem(
+            item_id=item["Id"],
+            item_name=item["Name"],
+            item_type=item["Type"],
+            played_percentage=user_data.get("PlayedPercentage"),
+            play_count=user_data.get("PlayCount", 0),
+            last_played_date=user_data.get("LastPlayedDate"),
+            is_played=user_data.get("Played", False)
+        )
 
-            return watch_items
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client"""
+        await self.http.aclose()
@@ -1,17 +1,21 @@
-from typing import List, Any, Optional
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import httpx
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 from datetime import datetime
 from enum import IntEnum
 
+from ..sync_stats import phase
+
 # Media characteristics
+# The request models below only declare the fields we use. Anything else in
+# the payload (download queues, seasons, ...) is dropped while parsing.
 class MediaInfo(BaseModel):
     id: int
     mediaType: str
     tmdbId: int
     status: int
     serviceUrl: Optional[str] = None
-    downloadStatus: List[Any] = Field(default_factory=list)
 
 class RequestStatus(IntEnum):
     PENDING = 1
@@ -48,7 +52,7 @@ class JellyseerrRequest(BaseModel):
     seasonCount: Optional[int] = None
 
     class Config:
-            extra = "allow"
+            extra = "ignore"
 
 class PageInfo(BaseModel):
     pages: int
@@ -61,33 +65,119 @@ class RequestsResponse(BaseModel):
     results: List[JellyseerrRequest]
 
     class Config:
-            extra = "allow"
+            extra = "ignore"
 
 class JellyseerrClient:
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        page_size: int = 100,
+        page_concurrency: int = 4,
+        http_client: httpx.AsyncClient | None = None
+    ):
         self.base_url = base_url.rstrip("/")
         self.api_key = {"X-Api-Key": api_key}
-
-    async def get_requests(self, page: int = 1, take: int = 100) -> RequestsResponse:
+        self.page_size = page_size
+        self.page_concurrency = page_concurrency
+        # Long-lived so connections are kept alive between calls
+        self.http = http_client or httpx.AsyncClient()
+
+    async def get_requests(
+        self,
+        page: int = 1,
+        take: int | None = None,
+        sort: str | None = None
+    ) -> RequestsResponse:
         """Get one page of requests from Jellyseerr"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        take = take or self.page_size
+        params: dict[str, int | str] = {"take": take, "skip": (page - 1) * take}
+        if sort:
+            params["sort"] = sort
+
+        with phase("fetch"):
+            response = await self.http.get(
                 f"{self.base_url}/api/v1/request",
                 headers=self.api_key,
-                params={"take": take, "skip": (page - 1) * take}
+                params=params
             )
             response.raise_for_status()
-            return RequestsResponse(**response.json())
+            data = response.json()
+        with phase("parse"):
+            return RequestsResponse(**data)
+
+    async def get_request(self, request_id: int) -> JellyseerrRequest | None:
+        """Get a single request from Jellyseerr, None if it doesn't exist anymore"""
+        response = await self.http.get(
+            f"{self.base_url}/api/v1/request/{request_id}",
+            headers=self.api_key
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return JellyseerrRequest(**response.json())
+
+    async def get_all_requests(self, attempts: int = 3) -> Tuple[List[JellyseerrRequest], bool]:
+        """
+        Get all requests from Jellyseerr, each one once.
+        Requests created or deleted while paging shift the offsets, so pages can
+        repeat or miss requests. The listing is retried until the number of unique
+        requests matches the total Jellyseerr reports.
+        Returns the requests and whether the listing is known to be complete.
+        """
+        for _ in range(attempts):
+            requests, total = await self._fetch_all_requests()
+            if total is None or len(requests) == total:
+                return requests, True
+        return requests, False
 
-    async def get_all_requests(self) -> List[JellyseerrRequest]:
+    async def _fetch_all_requests(self) -> Tuple[List[JellyseerrRequest], int | None]:
         """
-        Get all requests from Jellyseerr
+        Fetch every page once, deduplicated by id, along with the reported total.
+        The first page tells us how many pages there are, the rest are fetched concurrently.
         """
-        all_requests = []
+        first_page = await self.get_requests(page=1)
+        all_requests: Dict[int, JellyseerrRequest] = {request.id: request for request in first_page.results}
+
+        # Check if we have more pages
+        if not first_page.pageInfo or first_page.pageInfo.pages <= 1:
+            total = first_page.pageInfo.results if first_page.pageInfo else None
+            return list(all_requests.values()), total
+
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+
+        async def fetch_page(page: int) -> RequestsResponse:
+            async with semaphore:
+                return await self.get_requests(page=page)
+
+        responses = await asyncio.gather(*(
+            fetch_page(page) for page in range(2, first_page.pageInfo.pages + 1)
+        ))
+        total = first_page.pageInfo.results
+        for response in responses:
+            for request in response.results:
+                all_requests[request.id] = request
+            if response.pageInfo:
+                # The most recent total, in case requests were added while paging
+                total = response.pageInfo.results
+
+        return list(all_requests.values()), total
+
+    async def get_requests_since(self, since: datetime) -> List[JellyseerrRequest]:
+        """
+        Get requests updated at or after `since`, newest first.
+        Stops paging at the first request older than `since`.
+        """
+        changed_requests = []
         page = 1
         while True:
-            response = await self.get_requests(page=page)
-            all_requests.extend(response.results)
+            # "modified" sorts by updatedAt, most recent first
+            response = await self.get_requests(page=page, sort="modified")
+
+            for request in response.results:
+                if request.updatedAt < since:
+                    return changed_requests
+                changed_requests.append(request)
 
             # Check if we have more pages
             if not response.pageInfo or page >= response.pageInfo.pages:
@@ -95,7 +185,11 @@ class JellyseerrClient:
 
             page += 1
 
-        return all_requests
+        return changed_requests
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client"""
+        await self.http.aclose()
 
     # Test script
 async def test_jellyseerr_client():
@@ -125,8 +219,8 @@ async def test_jellyseerr_client():
                 print(f"Season count: {first_request.seasonCount}")
 
         # Test getting all requests
-        all_requests = await client.get_all_requests()
-        print(f"\nFetched all {len(all_requests)} requests successfully")
+        all_requests, complete = await client.get_all_requests()
+        print(f"\nFetched all {len(all_requests)} requests successfully{'' if complete else ' (incomplete)'}")
 
         # Show status distribution
         status_counts = {}
@@ -140,6 +234,8 @@ async def test_jellyseerr_client():
     except Exception as e:
         print(f"Error: {e}")
 
+    finally:
+        await client.aclose()
+
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(test_jellyseerr_client())
@@ -0,0 +1,106 @@
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+import asyncio
+import math
+import random
+import time
+import zoneinfo
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second, with bursts up to `capacity`.
+    The bucket can be paused, e.g. when the upstream asks us to back off.
+    """
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self._paused_until > now:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for the given number of seconds"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that grows by one after a full window of healthy
+    responses and halves when the upstream throttles or errors (AIMD).
+    """
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> "AdaptiveLimiter":
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        """Record a healthy response, raising the limit after a full window of them"""
+        self._successes += 1
+        if self._successes >= self.limit:
+            self.limit = min(self.maximum, self.limit + 1)
+            self._successes = 0
+
+    def on_throttle(self) -> None:
+        """Record a throttled or failed response and halve the limit"""
+        self.limit = max(self.minimum, self.limit // 2)
+        self._successes = 0
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given either in seconds or as an HTTP date"""
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        # "inf" and "nan" parse as floats, but would pause us forever
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            # A -0000 zone parses as naive, HTTP dates are always UTC
+            retry_at = retry_at.replace(tzinfo=zoneinfo.ZoneInfo("UTC"))
+        return max(0.0, (retry_at - datetime.now(zoneinfo.ZoneInfo("UTC"))).total_seconds())
+    except Exception:
+        return None
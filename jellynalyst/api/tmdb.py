@@ -1,37 +1,107 @@
 from typing import Dict, Any
+import asyncio
 import httpx
+import logging
 from datetime import datetime
 import zoneinfo
 
+from .ratelimit import AdaptiveLimiter, TokenBucket, backoff_delay, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+TMDB_API_URL = "https://api.themoviedb.org/3"
+
 class TMDBClient:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        http_client: httpx.AsyncClient | None = None,
+        rate_limit: float = 40.0,
+        max_concurrency: int = 16,
+        max_retries: int = 5
+    ):
         self.api_key = api_key
-        self.base_url = "https://api.themoviedb.org/3"
+        self.base_url = TMDB_API_URL
+        # Long-lived so the TLS connection is reused between lookups
+        self.http = http_client or httpx.AsyncClient()
+
+        # Requests per second budget, and a concurrency limit that grows while TMDB is healthy
+        self.bucket = TokenBucket(rate=rate_limit)
+        self.concurrency = AdaptiveLimiter(initial=min(4, max_concurrency), maximum=max_concurrency)
+        self.max_retries = max_retries
 
     async def get_media_details(self, media_id: int, media_type: str) -> Dict[str, Any]:
         """
         Get media details from TMDB for a movie or tv show
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/{media_type}/{media_id}",
-                params={"api_key": self.api_key}
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return {
-                "id": data["id"],
-                "title": data.get("title") or data.get("name"),  # movies use title, TV shows use name
-                "original_title": data.get("original_title") or data.get("original_name"),
-                "media_type": media_type,
-                "genres": [genre["name"] for genre in data.get("genres", [])],
-                "overview": data.get("overview"),
-                "release_date": datetime.strptime(
-                    data.get("release_date") or data.get("first_air_date"),
-                    "%Y-%m-%d"
-                ).replace(tzinfo=zoneinfo.ZoneInfo("UTC")) if (data.get("release_date") or data.get("first_air_date")) else None,
-                "poster_path": data.get("poster_path"),
-                "vote_average": data.get("vote_average"),
-                "last_updated": datetime.now(zoneinfo.ZoneInfo("UTC"))
-            }
+        response = await self._get(f"{self.base_url}/{media_type}/{media_id}")
+        data = response.json()
+
+        return {
+            "id": data["id"],
+            "title": data.get("title") or data.get("name"),  # movies use title, TV shows use name
+            "original_title": data.get("original_title") or data.get("original_name"),
+            "media_type": media_type,
+            "genres": [genre["name"] for genre in data.get("genres", [])],
+            "overview": data.get("overview"),
+            "release_date": datetime.strptime(
+                data.get("release_date") or data.get("first_air_date"),
+                "%Y-%m-%d"
+            ).replace(tzinfo=zoneinfo.ZoneInfo("UTC")) if (data.get("release_date") or data.get("first_air_date")) else None,
+            "poster_path": data.get("poster_path"),
+            "vote_average": data.get("vote_average"),
+            "last_updated": datetime.now(zoneinfo.ZoneInfo("UTC"))
+        }
+
+    async def _get(self, url: str) -> httpx.Response:
+        """
+        GET from TMDB within the rate limit.
+        429s honor Retry-After, 429/5xx and network errors are retried with
+        jittered backoff, and other errors are raised straight away.
+        """
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+
+            async with self.concurrency:
+                await self.bucket.acquire()
+                try:
+                    response = await self.http.get(url, params={"api_key": self.api_key})
+                except httpx.TransportError as e:
+                    self.concurrency.on_throttle()
+                    if last_attempt:
+                        raise
+                    error = e
+                else:
+                    error = None
+
+            # Sleep outside the concurrency slot, so backing off doesn't block other callers
+            if error is not None:
+                delay = backoff_delay(attempt)
+                logger.debug(f"TMDB request to {url} failed ({error}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if response.status_code == 429:
+                self.concurrency.on_throttle()
+                delay = parse_retry_after(response.headers.get("Retry-After")) or backoff_delay(attempt)
+                # Hold back every caller, not just this one
+                self.bucket.pause(delay)
+            elif response.status_code >= 500:
+                self.concurrency.on_throttle()
+                delay = backoff_delay(attempt)
+            else:
+                self.concurrency.on_success()
+                response.raise_for_status()
+                return response
+
+            if last_attempt:
+                response.raise_for_status()
+
+            logger.debug(f"TMDB returned {response.status_code} for {url}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        raise RuntimeError("unreachable")
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client"""
+        await self.http.aclose()
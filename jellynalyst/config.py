@@ -17,6 +17,80 @@ class Settings(BaseSettings):
     JELLYFIN_URL: str
     TMDB_API_KEY: str
 
+    # HTTP client settings
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0 # seconds
+    HTTP_TIMEOUT: float = 30.0 # seconds
+    HTTP2_ENABLED: bool = False # requires the h2 package
+
+    # TMDB rate limiting
+    TMDB_RATE_LIMIT: float = 40.0 # requests per second
+    TMDB_MAX_CONCURRENCY: int = 16
+    TMDB_MAX_RETRIES: int = 5
+
+    # TMDB cache settings
+    TMDB_CACHE_SIZE: int = 10000 # entries kept in memory
+    TMDB_CACHE_TTL: int = 3600 # seconds
+
+    # TMDB background refresh
+    TMDB_STALE_AFTER_DAYS: int = 7
+    TMDB_REFRESH_INTERVAL: int = 600 # seconds between refresh runs
+    TMDB_REFRESH_CRON: str | None = None # overrides the interval, e.g. "0 4 * * *"
+    TMDB_REFRESH_BATCH_SIZE: int = 100 # rows refreshed per run
+    TMDB_NEGATIVE_TTL_DAYS: int = 7 # how long a failed lookup is remembered
+
+    # Sync settings
+    JELLYFIN_PAGE_SIZE: int = 500
+    WATCH_HISTORY_FULL_SYNC_INTERVAL: int = 86400 # seconds between full watch history reconciles
+    UPSERT_CHUNK_SIZE: int = 500 # rows per bulk upsert statement
+    WATCH_HISTORY_CONCURRENCY: int = 4 # users synced at the same time
+    JELLYSEERR_PAGE_SIZE: int = 100
+    JELLYSEERR_PAGE_CONCURRENCY: int = 4 # request pages fetched at the same time
+    JELLYSEERR_FULL_SYNC_INTERVAL: int = 3600 # seconds between full request reconciles
+    JELLYSEERR_SYNC_INTERVAL: int = 300 # seconds between polls, can be raised once webhooks are set up
+    JELLYSEERR_SYNC_CRON: str | None = None # overrides the interval
+    USERS_SYNC_INTERVAL: int = 300 # seconds between user syncs
+    USERS_SYNC_CRON: str | None = None # overrides the interval
+    CATALOG_SYNC_INTERVAL: int = 900 # seconds between library catalog syncs
+    CATALOG_SYNC_CRON: str | None = None # overrides the interval
+    CATALOG_FULL_SYNC_INTERVAL: int = 86400 # seconds between full library catalog reconciles
+    WATCH_HISTORY_SYNC_INTERVAL: int = 300 # seconds between polls, can be raised once webhooks are set up
+    WATCH_HISTORY_SYNC_CRON: str | None = None # overrides the interval
+
+    # Scheduler settings
+    SCHEDULER_JITTER: float = 30.0 # random seconds added to each job's delay
+    SCHEDULER_RETRY_BASE: float = 30.0 # first retry delay after a failed run, doubled per failure
+    SCHEDULER_MAX_BACKOFF: float = 3600.0 # longest retry delay
+
+    # Run the scheduled sync jobs in the web app. Disable when running jellynalyst.worker separately
+    SYNC_JOBS_ENABLED: bool = True
+
+    # Shard per-user watch history syncs across worker processes through the sync_jobs table
+    SYNC_QUEUE_ENABLED: bool = False
+    SYNC_QUEUE_CONSUMERS: int = 1 # consumers per process, each runs WATCH_HISTORY_CONCURRENCY jobs at once
+    SYNC_QUEUE_POLL_INTERVAL: float = 5.0 # seconds between claims when the queue is empty
+    SYNC_QUEUE_VISIBILITY_TIMEOUT: int = 1800 # seconds before a claimed job is assumed abandoned
+    SYNC_QUEUE_MAX_ATTEMPTS: int = 5
+
+    SYNC_RUN_RETENTION_DAYS: int = 30 # how long sync runs are kept in the ledger
+
+    # Only the process holding this Postgres advisory lock runs the scheduled jobs
+    SYNC_LEADER_ELECTION: bool = True
+    SYNC_LEADER_LOCK_ID: int = 7314520193 # any bigint, shared by all processes of one deployment
+    SYNC_LEADER_CHECK_INTERVAL: float = 15.0 # seconds between lock attempts / leader health checks
+
+    # Webhook ingestion
+    JELLYFIN_WEBHOOK_TOKEN: str | None = None # if set, required in the X-Webhook-Token header
+    JELLYSEERR_WEBHOOK_TOKEN: str | None = None # if set, required as the Authorization header
+    WEBHOOK_QUEUE_SIZE: int = 10000 # events buffered before the endpoint returns 503
+    WEBHOOK_BATCH_SIZE: int = 200 # events per ingest batch
+    WEBHOOK_BATCH_WINDOW: float = 2.0 # seconds to collect events before writing a batch
+
+    # Prometheus metrics, served at /metrics by the web app
+    WORKER_METRICS_PORT: int | None = 9100 # port the standalone worker serves metrics on
+    EVENT_LOOP_LAG_INTERVAL: float = 1.0 # seconds between event loop lag checks
+
     model_config = {
             "env_file": ".env",
             "case_sensitive": True,
@@ -1,6 +1,6 @@
-from .models import Base, MediaRequest, init_db, JellyfinUsers, JellyfinWatchHistory, TMDBMedia, RequestStatus
-from .dependencies import get_session, init_session_maker
+from .models import Base, MediaRequest, init_db, JellyfinUsers, JellyfinWatchHistory, MediaItem, TMDBMedia, TMDBNegativeLookup, RequestStatus, SyncJob, SyncJobStatus, SyncRun, SyncState
+from .dependencies import get_session, get_session_maker, init_session_maker
 
 __all__ = ['Base', 'MediaRequest', 'init_db',
-    'get_session', 'init_session_maker',
-    'JellyfinUsers', 'JellyfinWatchHistory', 'TMDBMedia', 'RequestStatus']
+    'get_session', 'get_session_maker', 'init_session_maker',
+    'JellyfinUsers', 'JellyfinWatchHistory', 'MediaItem', 'TMDBMedia', 'TMDBNegativeLookup', 'RequestStatus', 'SyncJob', 'SyncJobStatus', 'SyncRun', 'SyncState']
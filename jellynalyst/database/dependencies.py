@@ -9,6 +9,12 @@ def init_session_maker(new_session_maker: async_sessionmaker[AsyncSession]) -> N
     global session_maker
     session_maker = new_session_maker
 
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Get the global session maker, for work that outlives a request"""
+    if session_maker is None:
+        raise RuntimeError("Database session maker not initialized")
+    return session_maker
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting database sessions"""
     if session_maker is None:
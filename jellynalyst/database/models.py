@@ -1,8 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import String, DateTime, ARRAY, Boolean, Enum, Float, ForeignKey, Integer, BigInteger, func
+from sqlalchemy import String, DateTime, ARRAY, Boolean, Enum, Float, ForeignKey, Integer, BigInteger, Text, func
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 from typing import List
 import enum
 
@@ -16,6 +16,11 @@ class RequestStatus(enum.Enum):
     DECLINED = "declined"
     DELETED = "deleted"
 
+class SyncJobStatus(enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"  # Out of attempts, kept for inspection
+
 # Jellyfin Users
 class JellyfinUsers(Base):
     __tablename__ = "jellyfin_users"
@@ -51,6 +56,43 @@ class TMDBMedia(Base):
     # Relationship with MediaRequest
     requests: Mapped[List["MediaRequest"]] = relationship("MediaRequest", back_populates="tmdb_info")
 
+# TMDB lookups known to fail (404, unparseable), so they aren't retried every cycle
+class TMDBNegativeLookup(Base):
+    __tablename__ = "tmdb_negative_lookups"
+
+    tmdb_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    media_type: Mapped[str] = mapped_column(String(50), primary_key=True)
+    reason: Mapped[str] = mapped_column(String(255), nullable=False)
+    failure_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    suppressed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # Lookups skipped thanks to this entry
+    last_failed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<TMDBNegativeLookup(tmdb_id={self.tmdb_id}, media_type={self.media_type}, reason={self.reason})>"
+
+# Jellyfin library catalog, shared by every user
+class MediaItem(Base):
+    __tablename__ = "media_items"
+
+    item_id: Mapped[str] = mapped_column(String(100), primary_key=True)  # Jellyfin's item ID
+    item_type: Mapped[str] = mapped_column(String(50), nullable=False)  # Movie, Episode, etc.
+    item_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    series_id: Mapped[str] = mapped_column(String(100), nullable=True)  # Episodes only
+    series_name: Mapped[str] = mapped_column(String(255), nullable=True)
+
+    # For episodes this is the series' TMDB id
+    tmdb_id: Mapped[int] = mapped_column(ForeignKey("tmdb_media.id"), nullable=True)
+    imdb_id: Mapped[str] = mapped_column(String(50), nullable=True)
+    genres: Mapped[List[str]] = mapped_column(ARRAY(String), nullable=True)
+    runtime_ticks: Mapped[int] = mapped_column(BigInteger, nullable=True)
+    production_year: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self) -> str:
+        return f"<MediaItem(item_id={self.item_id}, name={self.item_name})>"
+
 # Jellyfin Watch History
 class JellyfinWatchHistory(Base):
     __tablename__ = "watch_history"
@@ -95,6 +137,81 @@ class JellyfinWatchHistory(Base):
             return f"<JellyfinWatchHistory(id={self.id}, user={self.user_id}, item={self.item_name})>"
 
 
+# Sync cursors
+class SyncState(Base):
+    __tablename__ = "sync_state"
+
+    # e.g. "watch_history:<jellyfin_id>"
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    cursor: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)  # High-water mark for incremental syncs
+    last_synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_full_sync_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)  # Last sync, or last time it was skipped as up to date
+
+    def __repr__(self) -> str:
+        return f"<SyncState(key={self.key}, cursor={self.cursor})>"
+
+# Queued sync work, claimed by workers with FOR UPDATE SKIP LOCKED.
+# Finished jobs are deleted.
+class SyncJob(Base):
+    __tablename__ = "sync_jobs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    job_type: Mapped[str] = mapped_column(String(50), nullable=False)  # e.g. "watch_history"
+    user_id: Mapped[str] = mapped_column(String(100), nullable=False)  # Jellyfin user ID
+    status: Mapped[SyncJobStatus] = mapped_column(Enum(SyncJobStatus), nullable=False, default=SyncJobStatus.PENDING)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    run_after: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_by: Mapped[str] = mapped_column(String(255), nullable=True)
+    locked_until: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)  # Visibility timeout
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # At most one queued or running job per user and type
+        Index(
+            "uq_sync_jobs_active", "job_type", "user_id", unique=True,
+            postgresql_where=status.in_([SyncJobStatus.PENDING, SyncJobStatus.RUNNING])
+        ),
+        Index("ix_sync_jobs_claim", "status", "run_after"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SyncJob(id={self.id}, type={self.job_type}, user={self.user_id}, status={self.status})>"
+
+# One row per sync run, for tracking throughput over time
+class SyncRun(Base):
+    __tablename__ = "sync_runs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    job: Mapped[str] = mapped_column(String(50), nullable=False)  # Scheduler job name
+    user_id: Mapped[str] = mapped_column(String(100), nullable=True)  # Set for per-user runs
+    status: Mapped[str] = mapped_column(String(20), nullable=False)  # success or failed
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    # Seconds spent per phase, summed over concurrent work
+    fetch_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)  # Upstream requests
+    parse_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)  # Response validation
+    enrich_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)  # TMDB and series lookups
+    write_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)  # DB upserts and commits
+
+    # Rows inserted/updated count every table the run writes to
+    items_fetched: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    items_inserted: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    items_updated: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    items_skipped: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    errors: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_sync_runs_job_started_at", "job", "started_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SyncRun(id={self.id}, job={self.job}, status={self.status})>"
+
 class MediaRequest(Base):
     __tablename__ = "media_requests"
 
@@ -35,12 +35,17 @@ logger = logging.getLogger(__name__)
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from prometheus_client import REGISTRY
 import asyncio
 
 # Local imports
 from .config import Settings
+from .api.clients import ApiClients
 from .database import init_db, init_session_maker
-from .tasks.sync import sync_jellyseerr_requests, sync_jellyfin_users, sync_jellyfin_watch_history
+from .metrics import CacheCollector, instrument_engine, monitor_event_loop_lag
+from .services.tmdb import get_media_cache, init_media_cache
+from .services.webhooks import init_watch_events, get_watch_events
+from .tasks.sync import ingest_watch_events, start_job_consumers, start_sync_jobs, stop_job_consumers, stop_sync_jobs
 from .routes import router
 
 
@@ -56,56 +61,71 @@ settings = Settings(_env_file='.env')
 app.include_router(router)
 
 # Global variables
-sync_task = None
-sync_users_task = None
-sync_watch_task = None
+scheduler = None
+leader_task = None
+job_consumers = []
+webhook_ingest_task = None
+loop_lag_task = None
+api_clients = None
 
 @app.on_event("startup")
 async def startup_event():
-    global sync_task, sync_users_task, sync_watch_task
+    global scheduler, leader_task, job_consumers, webhook_ingest_task, loop_lag_task, api_clients
 
     try:
         # Init database
         logger.info("Initializing database...")
         session_maker = await init_db(settings)
         init_session_maker(session_maker)
+        instrument_engine(session_maker.kw["bind"])
         logger.info("Database initialized")
 
-        # Start sync task
-        logger.info("Starting requests sync task...")
-        sync_task = asyncio.create_task(
-            sync_jellyseerr_requests(
+        init_media_cache(max_size=settings.TMDB_CACHE_SIZE, ttl=settings.TMDB_CACHE_TTL)
+        REGISTRY.register(CacheCollector("tmdb", get_media_cache))
+        loop_lag_task = asyncio.create_task(monitor_event_loop_lag(settings.EVENT_LOOP_LAG_INTERVAL))
+        init_watch_events(max_size=settings.WEBHOOK_QUEUE_SIZE)
+
+        # Shared upstream clients, pooled for the lifetime of the app
+        api_clients = ApiClients(settings)
+        app.state.clients = api_clients
+
+        # Start the periodic sync jobs, unless a separate worker runs them
+        if settings.SYNC_JOBS_ENABLED:
+            logger.info("Starting sync scheduler...")
+            scheduler, leader_task = start_sync_jobs(
                 session_maker=session_maker,
-                settings=settings
+                settings=settings,
+                clients=api_clients
             )
-        )
-
-        sync_users_task = asyncio.create_task(
-            sync_jellyfin_users(
+            if leader_task:
+                leader_task.add_done_callback(handle_sync_task_complete)
+            app.state.scheduler = scheduler
+            job_consumers = start_job_consumers(
                 session_maker=session_maker,
-                settings=settings
+                settings=settings,
+                clients=api_clients
             )
-        )
+        else:
+            logger.info("Sync jobs disabled, expecting a separate worker to run them")
 
-        sync_watch_task = asyncio.create_task(
-            sync_jellyfin_watch_history(
+        webhook_ingest_task = asyncio.create_task(
+            ingest_watch_events(
                 session_maker=session_maker,
-                settings=settings
+                settings=settings,
+                clients=api_clients,
+                queue=get_watch_events()
             )
         )
+        webhook_ingest_task.add_done_callback(handle_sync_task_complete)
 
-        sync_task.add_done_callback(handle_sync_task_complete)
-        sync_users_task.add_done_callback(handle_sync_task_complete)
-        sync_watch_task.add_done_callback(handle_sync_task_complete)
-
-        logger.info("Sync task started successfully")
+        logger.info("Startup complete")
 
     except Exception as e:
         logger.error(f"Error during startup: {e}")
         raise
 
 def handle_sync_task_complete(task):
-    """Handle the completion of the requests sync task"""
+    """Handle the completion of a background task"""
     try:
         task.result()
     except asyncio.CancelledError:
@@ -115,29 +135,25 @@ def handle_sync_task_complete(task):
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    global sync_task, sync_users_task, sync_watch_task
+    global scheduler, leader_task, job_consumers, webhook_ingest_task, loop_lag_task, api_clients
+
+    # Stop scheduled jobs and hand leadership to another process
+    if scheduler:
+        await stop_sync_jobs(scheduler, leader_task)
+    await stop_job_consumers(job_consumers)
 
-    # Cancel sync task
-    if sync_task:
-        logger.info("Cancelling sync task...")
-        sync_task.cancel()
+    if webhook_ingest_task:
+        logger.info("Cancelling webhook ingest task...")
+        webhook_ingest_task.cancel()
         try:
-            await sync_task
+            await webhook_ingest_task
         except asyncio.CancelledError:
-            logger.info("Sync task cancelled successfully")
-
-        if sync_users_task:  # Add this block
-            logger.info("Cancelling Jellyfin users sync task...")
-            sync_users_task.cancel()
-            try:
-                await sync_users_task
-            except asyncio.CancelledError:
-                logger.info("Jellyfin users sync task cancelled successfully")
-
-        if sync_watch_task:
-            logger.info("Cancelling Jellyfin watch history sync task...")
-            sync_watch_task.cancel()
-            try:
-                await sync_watch_task
-            except asyncio.CancelledError:
-                logger.info("Jellyfin watch history sync task cancelled successfully")
+            logger.info("Webhook ingest task cancelled successfully")
+
+    if loop_lag_task:
+        loop_lag_task.cancel()
+
+    # Close pooled upstream connections once nothing uses them anymore
+    if api_clients:
+        logger.info("Closing HTTP clients...")
+        await api_clients.aclose()
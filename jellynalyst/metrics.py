@@ -0,0 +1,172 @@
+"""
+Prometheus metrics.
+
+Metrics are per process. The web app serves them at /metrics, a
+standalone worker on its own port (WORKER_METRICS_PORT).
+"""
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import Any, Callable, Dict, Iterator, Tuple
+import asyncio
+import httpx
+import logging
+import time
+
+from .sync_stats import RunStats
+
+logger = logging.getLogger(__name__)
+
+# Sync jobs run from seconds to the better part of an hour
+JOB_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+SYNC_JOB_DURATION = Histogram(
+    "jellynalyst_sync_job_duration_seconds",
+    "Duration of scheduled sync job runs",
+    ["job", "status"],
+    buckets=JOB_BUCKETS
+)
+SYNC_JOB_LAST_SUCCESS = Gauge(
+    "jellynalyst_sync_job_last_success_timestamp_seconds",
+    "When each scheduled job last succeeded",
+    ["job"]
+)
+SYNC_QUEUE_JOB_DURATION = Histogram(
+    "jellynalyst_sync_queue_job_duration_seconds",
+    "Duration of sync jobs taken from the job queue",
+    ["job_type", "status"],
+    buckets=JOB_BUCKETS
+)
+SYNC_PHASE_SECONDS = Counter(
+    "jellynalyst_sync_phase_seconds",
+    "Time sync runs spent in each phase, summed over concurrent work",
+    ["job", "phase"]
+)
+SYNC_ITEMS = Counter(
+    "jellynalyst_sync_items",
+    "Items handled by sync runs",
+    ["job", "result"]
+)
+
+UPSTREAM_REQUEST_DURATION = Histogram(
+    "jellynalyst_upstream_request_duration_seconds",
+    "Time until upstream APIs responded, or failed to",
+    ["upstream", "method"]
+)
+UPSTREAM_RESPONSES = Counter(
+    "jellynalyst_upstream_responses",
+    "Upstream API responses by status code, 'error' when none came back",
+    ["upstream", "status"]
+)
+
+DB_QUERY_DURATION = Histogram(
+    "jellynalyst_db_query_duration_seconds",
+    "Database statement execution time",
+    ["operation"],
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+)
+DB_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+EVENT_LOOP_LAG = Histogram(
+    "jellynalyst_event_loop_lag_seconds",
+    "How late the event loop woke up a sleeping task",
+    buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5)
+)
+
+WATCH_HISTORY_SYNC_LAG = Gauge(
+    "jellynalyst_watch_history_sync_lag_seconds",
+    "Time since each user's watch history was last synced or found up to date",
+    ["user_id", "username"]
+)
+
+def observe_sync_run(job: str, stats: RunStats) -> None:
+    """Add a finished run's phase timings and item counts"""
+    for name, seconds in stats.phases.items():
+        SYNC_PHASE_SECONDS.labels(job, name).inc(seconds)
+    for name, value in stats.counts.items():
+        SYNC_ITEMS.labels(job, name).inc(value)
+
+def upstream_key(url: str | httpx.URL) -> Tuple[str, int | None]:
+    """Host and explicit port of a URL, to tell upstreams on the same host apart"""
+    url = httpx.URL(url)
+    return url.host, url.port
+
+class MetricsTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a transport to time requests and count responses per upstream.
+    Sits below the client, so timeouts and connection errors are counted too.
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport, upstreams: Dict[Tuple[str, int | None], str]):
+        self.transport = transport
+        self.upstreams = upstreams
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream = self.upstreams.get(upstream_key(request.url), "other")
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            UPSTREAM_RESPONSES.labels(upstream, "error").inc()
+            raise
+        finally:
+            UPSTREAM_REQUEST_DURATION.labels(upstream, request.method).observe(time.perf_counter() - started)
+
+        UPSTREAM_RESPONSES.labels(upstream, str(response.status_code)).inc()
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement the engine runs"""
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # A connection runs one statement at a time
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("query_started", None)
+        if started is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+        DB_QUERY_DURATION.labels(operation if operation in DB_OPERATIONS else "OTHER").observe(
+            time.perf_counter() - started
+        )
+
+class CacheCollector(Collector):
+    """
+    Reports a TTLCache's counters at scrape time.
+    Takes a getter, since the cache may be replaced after registering.
+    """
+    def __init__(self, name: str, get_cache: Callable[[], Any]):
+        self.name = name
+        self.get_cache = get_cache
+
+    def collect(self) -> Iterator[Metric]:
+        stats = self.get_cache().stats()
+        prefix = f"jellynalyst_{self.name}_cache"
+
+        lookups = CounterMetricFamily(f"{prefix}_lookups", f"{self.name} cache lookups by result", labels=["result"])
+        for result, key in (("hit", "hits"), ("miss", "misses"), ("coalesced", "coalesced")):
+            lookups.add_metric([result], stats[key])
+        yield lookups
+
+        yield GaugeMetricFamily(f"{prefix}_hit_ratio", f"Share of {self.name} cache lookups served without a load",
+            value=stats["hit_ratio"])
+        yield GaugeMetricFamily(f"{prefix}_size", f"Entries in the {self.name} cache", value=stats["size"])
+
+async def monitor_event_loop_lag(interval: float = 1.0) -> None:
+    """
+    Measure how late the event loop wakes up from a sleep.
+    Lag means something is blocking the loop, e.g. CPU heavy parsing.
+    """
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lag = max(time.perf_counter() - expected, 0.0)
+        EVENT_LOOP_LAG.observe(lag)
+        if lag > 1.0:
+            logger.warning(f"Event loop was blocked for {lag:.2f}s")
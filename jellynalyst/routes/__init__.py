@@ -1,9 +1,15 @@
 from fastapi import APIRouter
 from .api import router as api_router
 from .debug import router as debug_router
+from .jobs import router as jobs_router
+from .metrics import router as metrics_router
 from .views import router as views_router
+from .webhooks import router as webhooks_router
 
 router = APIRouter()
 router.include_router(api_router)
 router.include_router(debug_router)
+router.include_router(jobs_router)
+router.include_router(metrics_router)
 router.include_router(views_router)
+router.include_router(webhooks_router)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List
 
 from ..database import get_session
+from ..services.sync_runs import SyncRunService
 
 router = APIRouter()
 
@@ -9,3 +11,45 @@ router = APIRouter()
 async def get_stats(session: AsyncSession = Depends(get_session)):
     #TODO: Implement stats endpoint
     pass
+
+@router.get("/sync-runs")
+async def list_sync_runs(
+    job: str | None = None,
+    user_id: str | None = None,
+    limit: int = Query(50, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session)
+) -> List[Dict[str, Any]]:
+    """
+    Recent sync runs with their phase timings and row counts, newest first
+    """
+    runs = await SyncRunService(session).list_runs(job=job, user_id=user_id, limit=limit)
+
+    results = []
+    for run in runs:
+        duration = (run.finished_at - run.started_at).total_seconds()
+        written = run.items_inserted + run.items_updated
+        results.append({
+            "id": run.id,
+            "job": run.job,
+            "user_id": run.user_id,
+            "status": run.status,
+            "error": run.error,
+            "started_at": run.started_at,
+            "finished_at": run.finished_at,
+            "duration_seconds": duration,
+            "phases": {
+                "fetch": run.fetch_seconds,
+                "parse": run.parse_seconds,
+                "enrich": run.enrich_seconds,
+                "write": run.write_seconds,
+            },
+            "items": {
+                "fetched": run.items_fetched,
+                "inserted": run.items_inserted,
+                "updated": run.items_updated,
+                "skipped": run.items_skipped,
+            },
+            "errors": run.errors,
+            "rows_per_second": written / duration if duration > 0 else None,
+        })
+    return results
@@ -1,18 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, text
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List
 from pydantic import BaseModel
-import httpx
 import logging
 
 from ..database import get_session
-from ..database import TMDBMedia, MediaRequest, JellyfinUsers, JellyfinWatchHistory
+from ..database import TMDBMedia, TMDBNegativeLookup, MediaRequest, JellyfinUsers, JellyfinWatchHistory
+from ..api.clients import ApiClients
 from ..api.jellyfin import JellyfinClient
 from ..services.jellyfin import JellyfinService
-from ..services.tmdb import TMDBClient, TMDBService
-from ..config import Settings, get_settings
+from ..services.tmdb import TMDBService, get_media_cache
+from ..config import get_settings
 
 logger = logging.getLogger("jellynalyst.routes.debug")
 
@@ -47,11 +47,11 @@ class DebugRequest(BaseModel):
 
 router = APIRouter(prefix="/debug")
 
-def get_jellyfin_client(settings: Settings = Depends(get_settings)) -> JellyfinClient:
-    return JellyfinClient(
-        base_url=settings.JELLYFIN_URL,
-        api_key=settings.JELLYFIN_API_KEY
-    )
+def get_api_clients(request: Request) -> ApiClients:
+    return request.app.state.clients
+
+def get_jellyfin_client(clients: ApiClients = Depends(get_api_clients)) -> JellyfinClient:
+    return clients.jellyfin
 
 @router.get("/simple-test")
 async def simple_test(session: AsyncSession = Depends(get_session)):
@@ -358,33 +358,32 @@ async def get_user_genre_stats(
 @router.post("/force-sync-watch-history")
 async def force_sync_watch_history(
     session: AsyncSession = Depends(get_session),
-    client: JellyfinClient = Depends(get_jellyfin_client)
+    clients: ApiClients = Depends(get_api_clients)
 ):
     """Force an immediate sync of watch history"""
     try:
+        client = clients.jellyfin
         users = await client.get_users()
         logger.info(f"Found {len(users)} users to process")
 
-        tmdb_client = TMDBClient(api_key=get_settings().TMDB_API_KEY)
-        tmdb_service = TMDBService(session, tmdb_client)
+        tmdb_service = TMDBService(
+            session, clients.tmdb,
+            negative_ttl=timedelta(days=get_settings().TMDB_NEGATIVE_TTL_DAYS)
+        )
 
         total_synced = 0
         for user in users:
             logger.info(f"Processing user: {user.username}")
 
-            jellyfin_service = JellyfinService(session, client, tmdb_service)
-            watch_items = await client.get_watch_history(user.jellyfin_id)
-            logger.info(f"Found {len(watch_items)} items for user {user.username}")
-
-            for item in watch_items:
-                try:
-                    await jellyfin_service._upsert_watch_history(user.jellyfin_id, item)
-                    total_synced += 1
-                except Exception as e:
-                    logger.error(f"Error upserting item {item.item_name}: {e}", exc_info=True)
-                    continue
+            jellyfin_service = JellyfinService(
+                session, client, tmdb_service,
+                chunk_size=get_settings().UPSERT_CHUNK_SIZE
+            )
+            async for page in client.iter_watch_history(user.jellyfin_id):
+                logger.info(f"Found {len(page)} items for user {user.username}")
+                total_synced += await jellyfin_service._upsert_watch_history_batch(user.jellyfin_id, page)
+                await session.commit()
 
-            await session.commit()
             logger.info(f"Completed sync for user {user.username}")
 
         return {
@@ -523,37 +522,36 @@ async def get_provider_ids(
 ):
     """Debug endpoint to examine provider IDs from Jellyfin items"""
     try:
-        async with httpx.AsyncClient() as http_client:
-            response = await http_client.get(
-                f"{client.base_url}/Users/{user_id}/Items",
-                headers=client.headers,
-                params={
-                    "SortBy": "DatePlayed",
-                    "SortOrder": "Descending",
-                    "IncludeItemTypes": "Movie,Episode",
-                    "Recursive": "true",
-                    "Fields": "DateCreated,Path,Genres,MediaStreams,Overview,ProviderIds,UserData"
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            provider_info = []
-            for item in data.get("Items", [])[:limit]:
-                provider_info.append({
-                    "name": item["Name"],
-                    "type": item["Type"],
-                    "provider_ids": item.get("ProviderIds", {}),
-                    "path": item.get("Path", ""),
-                    "genres": item.get("Genres", [])
-                    # Include path for additional context
-                })
-
-            return {
-                "total_items": len(data.get("Items", [])),
-                "showing": len(provider_info),
-                "provider_info": provider_info
+        response = await client.http.get(
+            f"{client.base_url}/Users/{user_id}/Items",
+            headers=client.headers,
+            params={
+                "SortBy": "DatePlayed",
+                "SortOrder": "Descending",
+                "IncludeItemTypes": "Movie,Episode",
+                "Recursive": "true",
+                "Fields": "DateCreated,Path,Genres,MediaStreams,Overview,ProviderIds,UserData"
             }
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        provider_info = []
+        for item in data.get("Items", [])[:limit]:
+            provider_info.append({
+                "name": item["Name"],
+                "type": item["Type"],
+                "provider_ids": item.get("ProviderIds", {}),
+                "path": item.get("Path", ""),
+                "genres": item.get("Genres", [])
+                # Include path for additional context
+            })
+
+        return {
+            "total_items": len(data.get("Items", [])),
+            "showing": len(provider_info),
+            "provider_info": provider_info
+        }
 
     except Exception as e:
         logger.error(f"Error getting provider IDs: {e}", exc_info=True)
@@ -696,6 +694,56 @@ async def get_tmdb_stats(session: AsyncSession = Depends(get_session)):
             detail=f"Error getting TMDB stats: {str(e)}"
         )
 
+@router.get("/tmdb-cache")
+async def get_tmdb_cache_stats():
+    """Get hit/miss counters for the in-process TMDB cache"""
+    return get_media_cache().stats()
+
+@router.get("/tmdb-negative-cache")
+async def get_tmdb_negative_cache(
+    limit: int = 20,
+    session: AsyncSession = Depends(get_session)
+):
+    """Get the TMDB lookups currently known to fail"""
+    try:
+        result = await session.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(TMDBNegativeLookup.suppressed_count), 0)
+            )
+            .select_from(TMDBNegativeLookup)
+            .where(TMDBNegativeLookup.expires_at > func.now())
+        )
+        active_count, suppressed_total = result.one()
+
+        result = await session.execute(
+            select(TMDBNegativeLookup)
+            .order_by(TMDBNegativeLookup.suppressed_count.desc())
+            .limit(limit)
+        )
+        return {
+            "active_entries": active_count,
+            "suppressed_calls": suppressed_total,
+            "top_entries": [
+                {
+                    "tmdb_id": entry.tmdb_id,
+                    "media_type": entry.media_type,
+                    "reason": entry.reason,
+                    "failure_count": entry.failure_count,
+                    "suppressed_count": entry.suppressed_count,
+                    "expires_at": entry.expires_at.isoformat()
+                }
+                for entry in result.scalars()
+            ]
+        }
+
+    except Exception as e:
+        logger.error(f"Error getting TMDB negative cache: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=str(e)
+        )
+
 @router.get("/test-logging")
 async def test_logging():
     """Test that logging is working"""
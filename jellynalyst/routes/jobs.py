@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Any, Dict, List
+import logging
+
+from ..tasks.scheduler import Scheduler
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs")
+
+def get_scheduler(request: Request) -> Scheduler:
+    scheduler = getattr(request.app.state, "scheduler", None)
+    if scheduler is None:
+        raise HTTPException(status_code=503, detail="Scheduler is not running")
+    return scheduler
+
+@router.get("")
+async def list_jobs(scheduler: Scheduler = Depends(get_scheduler)) -> List[Dict[str, Any]]:
+    """
+    List scheduled jobs with their last run and next run.
+    Only the sync leader process has run information.
+    """
+    return scheduler.status()
+
+@router.post("/{name}/run", status_code=202)
+async def run_job(name: str, scheduler: Scheduler = Depends(get_scheduler)) -> Dict[str, Any]:
+    """Run a job now instead of waiting for its schedule"""
+    if name not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {name}")
+
+    if not scheduler.running:
+        # Another process is the sync leader and runs the jobs
+        raise HTTPException(status_code=409, detail="Jobs run in another process")
+
+    job = scheduler.run_now(name)
+    return {"status": "queued" if job.running else "triggered", "job": job.status()}
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+import logging
+import zoneinfo
+
+from ..database import JellyfinUsers, get_session
+from ..metrics import WATCH_HISTORY_SYNC_LAG
+from ..services.jellyfin import watch_history_state_key
+from ..services.sync_state import SyncStateService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(session: AsyncSession = Depends(get_session)) -> Response:
+    """
+    Prometheus metrics for this process, plus sync lag read from the database
+    """
+    try:
+        await update_sync_lag(session)
+    except Exception as e:
+        # Still serve the in-process metrics when the database is down
+        logger.warning(f"Failed to compute sync lag for metrics: {e}")
+
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+async def update_sync_lag(session: AsyncSession) -> None:
+    """
+    Set each user's time since their watch history was last synced, or found
+    idle and up to date. Users that were never synced report +Inf, so they trip lag alerts too.
+    """
+    users = (await session.scalars(select(JellyfinUsers))).all()
+    states = await SyncStateService(session).get_many(
+        [watch_history_state_key(user.jellyfin_id) for user in users]
+    )
+    now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+
+    # Start over, so deleted users don't linger
+    WATCH_HISTORY_SYNC_LAG.clear()
+    for user in users:
+        state = states.get(watch_history_state_key(user.jellyfin_id))
+        checked_at = state and (state.last_checked_at or state.last_synced_at)
+        if checked_at is None:
+            lag = float("inf")
+        else:
+            lag = (now - checked_at).total_seconds()
+        WATCH_HISTORY_SYNC_LAG.labels(user.jellyfin_id, user.username).set(lag)
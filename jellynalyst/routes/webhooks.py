@@ -0,0 +1,83 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request
+import asyncio
+import logging
+import secrets
+
+from ..api.clients import ApiClients
+from ..config import Settings, get_settings
+from ..database import get_session_maker
+from ..services.webhooks import (
+    REQUEST_EVENT_TYPES, WATCH_EVENT_TYPES,
+    JellyfinWebhookEvent, JellyseerrWebhookEvent, WatchEventQueue, get_watch_events
+)
+from ..tasks.sync import sync_jellyseerr_request
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/webhooks")
+
+def verify_jellyfin_token(
+    x_webhook_token: str | None = Header(default=None),
+    settings: Settings = Depends(get_settings)
+) -> None:
+    """Check the shared secret, if one is configured"""
+    expected = settings.JELLYFIN_WEBHOOK_TOKEN
+    if expected and not secrets.compare_digest(x_webhook_token or "", expected):
+        raise HTTPException(status_code=401, detail="Invalid webhook token")
+
+def verify_jellyseerr_token(
+    authorization: str | None = Header(default=None),
+    settings: Settings = Depends(get_settings)
+) -> None:
+    """Check the Authorization header Jellyseerr sends, if a token is configured"""
+    expected = settings.JELLYSEERR_WEBHOOK_TOKEN
+    if expected and not secrets.compare_digest(authorization or "", expected):
+        raise HTTPException(status_code=401, detail="Invalid webhook token")
+
+@router.post("/jellyfin", status_code=202, dependencies=[Depends(verify_jellyfin_token)])
+async def jellyfin_webhook(
+    event: JellyfinWebhookEvent,
+    queue: WatchEventQueue = Depends(get_watch_events)
+):
+    """
+    Receive Jellyfin Webhook plugin playback events.
+    Events are queued and written to watch history in batches by the ingest task.
+    """
+    if event.NotificationType not in WATCH_EVENT_TYPES:
+        # Acknowledge so the plugin doesn't retry events we don't use
+        return {"status": "ignored"}
+
+    try:
+        queue.submit(event)
+    except asyncio.QueueFull:
+        logger.warning("Webhook queue full, dropping event. Polling will pick it up")
+        raise HTTPException(status_code=503, detail="Ingest queue full")
+
+    return {"status": "queued"}
+
+@router.post("/jellyseerr", status_code=202, dependencies=[Depends(verify_jellyseerr_token)])
+async def jellyseerr_webhook(
+    event: JellyseerrWebhookEvent,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    settings: Settings = Depends(get_settings)
+):
+    """
+    Receive Jellyseerr webhook agent notifications.
+    The request is re-fetched and upserted after responding, so Jellyseerr isn't kept waiting.
+    """
+    if event.notification_type == "TEST_NOTIFICATION":
+        return {"status": "ok"}
+
+    if event.notification_type not in REQUEST_EVENT_TYPES or event.request is None:
+        return {"status": "ignored"}
+
+    clients: ApiClients = request.app.state.clients
+    background_tasks.add_task(
+        sync_jellyseerr_request,
+        session_maker=get_session_maker(),
+        settings=settings,
+        clients=clients,
+        request_id=event.request.request_id
+    )
+    return {"status": "queued"}
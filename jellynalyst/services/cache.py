@@ -0,0 +1,205 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Tuple, TypeVar
+import asyncio
+import time
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded in-memory cache with a per-entry TTL and LRU eviction.
+    Concurrent misses on the same key share a single load, whether they
+    come from get_or_load or get_or_load_many.
+    """
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[K, Tuple[float, V]] = OrderedDict()
+        self._inflight: Dict[K, asyncio.Future[V]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: K) -> V | None:
+        """
+        Get a cached value, or None if missing or expired
+        """
+        value = self._lookup(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _lookup(self, key: K) -> V | None:
+        """Get a cached value without touching the counters"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """
+        Cache a value, evicting the least recently used entries if full
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        """Drop a key from the cache"""
+        self._entries.pop(key, None)
+
+    async def get_or_load(self, key: K, loader: Callable[[], Awaitable[V]]) -> V:
+        """
+        Get a cached value, or load it. If a load for the key is already
+        in flight, wait for it instead of starting another one.
+        """
+        value = self._lookup(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        if key in self._inflight:
+            self.coalesced += 1
+            future = self._inflight[key]
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The load was cancelled along with its caller, do it ourselves
+                return await self.get_or_load(key, loader)
+
+        self.misses += 1
+        future: asyncio.Future[V] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+            self.set(key, value)
+            future.set_result(value)
+            return value
+
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+        except Exception as e:
+            future.set_exception(e)
+            # Mark as retrieved so it isn't reported when nobody else was waiting
+            future.exception()
+            raise
+
+        finally:
+            del self._inflight[key]
+
+    async def get_or_load_many(
+        self,
+        keys: Iterable[K],
+        loader: Callable[[List[K]], Awaitable[Dict[K, V]]]
+    ) -> Dict[K, V]:
+        """
+        Get cached values for several keys, loading all the misses with one loader call.
+        Keys already being loaded elsewhere are waited on instead of loaded again.
+        Keys the loader leaves out are missing from the result.
+        """
+        values: Dict[K, V] = {}
+        waiting: Dict[K, asyncio.Future[V]] = {}
+        missing: List[K] = []
+        for key in dict.fromkeys(keys):
+            if (value := self._lookup(key)) is not None:
+                self.hits += 1
+                values[key] = value
+            elif key in self._inflight:
+                self.coalesced += 1
+                waiting[key] = self._inflight[key]
+            else:
+                self.misses += 1
+                missing.append(key)
+
+        # Load our own misses before waiting on anyone else's, so two batches
+        # waiting on each other always make progress
+        if missing:
+            values.update(await self._load_batch(missing, loader))
+
+        retry: List[K] = []
+        for key, future in waiting.items():
+            try:
+                values[key] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The load was cancelled along with its caller
+                retry.append(key)
+            except LookupError:
+                # The other load didn't find it either
+                pass
+            except Exception:
+                # The other load failed, try it ourselves
+                retry.append(key)
+
+        if retry:
+            values.update(await self._load_batch(retry, loader))
+        return values
+
+    async def _load_batch(self, keys: List[K], loader: Callable[[List[K]], Awaitable[Dict[K, V]]]) -> Dict[K, V]:
+        """Load keys with one loader call, publishing each key as in flight meanwhile"""
+        loop = asyncio.get_running_loop()
+        futures: Dict[K, asyncio.Future[V]] = {}
+        for key in keys:
+            if key not in self._inflight:
+                futures[key] = self._inflight[key] = loop.create_future()
+
+        try:
+            loaded = await loader(keys)
+
+        except asyncio.CancelledError:
+            for future in futures.values():
+                future.cancel()
+            raise
+
+        except Exception as e:
+            for future in futures.values():
+                future.set_exception(e)
+                # Mark as retrieved so it isn't reported when nobody else was waiting
+                future.exception()
+            raise
+
+        else:
+            for key, future in futures.items():
+                if key in loaded:
+                    self.set(key, loaded[key])
+                    future.set_result(loaded[key])
+                else:
+                    future.set_exception(KeyError(key))
+                    future.exception()
+            return loaded
+
+        finally:
+            for key, future in futures.items():
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
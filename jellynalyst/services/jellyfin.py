@@ -1,20 +1,85 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy import String, any_, bindparam, func, select
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
 import logging
+import time
+import zoneinfo
 
-from ..api.jellyfin import JellyfinClient, JellyfinUser, JellyfinWatchItem
-from ..database import JellyfinUsers, JellyfinWatchHistory
+from ..api.jellyfin import JellyfinClient, JellyfinLibraryItem, JellyfinUser, JellyfinWatchItem
+from ..database import JellyfinUsers, JellyfinWatchHistory, MediaItem
 from ..services.tmdb import TMDBService
+from ..services.sync_state import SyncStateService
+from ..services.cache import TTLCache
+from ..services.sync_runs import INSERTED, execute_counted
+from ..sync_stats import count, phase
 
 logger = logging.getLogger(__name__)
 
+# Incremental syncs look back a little further than the stored cursor
+# to tolerate clock skew between us and Jellyfin. Upserts are idempotent.
+CURSOR_OVERLAP = timedelta(minutes=10)
+
+# Series id -> TMDB id, shared across users and syncs.
+# TMDB ids start at 1, so NO_TMDB_ID marks a series without one.
+NO_TMDB_ID = 0
+series_tmdb_ids: TTLCache[str, int] = TTLCache(max_size=5000, ttl=6 * 3600)
+
+CATALOG_STATE_KEY = "library_catalog"
+
+def watch_history_state_key(user_id: str) -> str:
+    """Sync state key for a user's watch history"""
+    return f"watch_history:{user_id}"
+
+# Catalog columns copied onto each user's watch history rows
+CATALOG_COLUMNS = (
+    "item_name", "item_type", "tmdb_id", "imdb_id", "genres",
+    "runtime_ticks", "production_year",
+)
+
+# Built once and executed with a list of rows, which SQLAlchemy sends
+# as multi-row INSERT ... VALUES batches instead of one statement per item
+_watch_history_insert = insert(JellyfinWatchHistory)
+WATCH_HISTORY_UPSERT = _watch_history_insert.on_conflict_do_update(
+    constraint='uq_user_item',
+    set_={
+        **{
+            column: _watch_history_insert.excluded[column]
+            for column in (
+                "item_name", "item_type", "tmdb_id", "imdb_id", "genres",
+                "played_percentage", "play_count", "last_played_date",
+                "is_played", "runtime_ticks", "production_year",
+            )
+        },
+        "updated_at": func.now(),
+    }
+).returning(INSERTED)
+
+_media_item_insert = insert(MediaItem)
+MEDIA_ITEM_UPSERT = _media_item_insert.on_conflict_do_update(
+    index_elements=["item_id"],
+    set_={
+        **{
+            column: _media_item_insert.excluded[column]
+            for column in (*CATALOG_COLUMNS, "series_id", "series_name")
+        },
+        "updated_at": func.now(),
+    }
+).returning(INSERTED)
+
 class JellyfinService:
     def __init__(self, session: AsyncSession,
         jellyfin_client: JellyfinClient,
-        tmdb_service: TMDBService):
+        tmdb_service: TMDBService,
+        full_sync_interval: timedelta = timedelta(days=1),
+        chunk_size: int = 500):
             self.session = session
             self.client = jellyfin_client
             self.tmdb_service = tmdb_service
+            self.full_sync_interval = full_sync_interval
+            self.chunk_size = chunk_size
+            self.sync_state = SyncStateService(session)
 
     async def sync_users(self) -> None:
         """
@@ -24,6 +89,7 @@ class JellyfinService:
             logger.debug("Getting users from Jellyfin client...")
             jellyfin_users = await self.client.get_users()
             logger.info(f"Fetched {len(jellyfin_users)} users from Jellyfin")
+            count(fetched=len(jellyfin_users))
 
             # Process each user
             for user in jellyfin_users:
@@ -32,7 +98,8 @@ class JellyfinService:
 
             # Commit the transaction
             logger.debug("Committing transaction...")
-            await self.session.commit()
+            with phase("write"):
+                await self.session.commit()
             logger.info("Sync complete")
 
         except Exception as e:
@@ -58,82 +125,265 @@ class JellyfinService:
             stmt = stmt.on_conflict_do_update(
                 index_elements=["jellyfin_id"],
                 set_=user_data
-            )
+            ).returning(INSERTED)
 
             logger.debug("Executing upsert...")
-            await self.session.execute(stmt)
+            with phase("write"):
+                inserted = await self.session.scalar(stmt)
+            if inserted:
+                count(inserted=1)
+            else:
+                count(updated=1)
             logger.debug(f"Upsert complete for user: {user_data['username']}")
 
         except Exception as e:
             logger.error(f"Error upserting user {user.username}: {e}", exc_info=True)
             raise
 
-    async def sync_user_watch_history(self, user_id: str) -> None:
+    async def sync_catalog(self, full: bool = False) -> None:
         """
-        Sync watch history for a specific user
+        Sync the library-wide item catalog, including TMDB enrichment.
+        Only items saved since the last sync are fetched, unless a full
+        reconcile is requested or due.
         """
         try:
-            logger.debug(f"Getting watch history for user {user_id}")
-            watch_items = await self.client.get_watch_history(user_id)
-            logger.info(f"Fetched {len(watch_items)} watch history items for user {user_id}")
+            state = await self.sync_state.get(CATALOG_STATE_KEY)
+            started_at = datetime.now(zoneinfo.ZoneInfo("UTC"))
+            full = full or self.sync_state.needs_full_sync(state, started_at, self.full_sync_interval)
+            since = None if full or state is None else state.cursor - CURSOR_OVERLAP
 
-            for item in watch_items:
-                await self._upsert_watch_history(user_id, item)
+            total_items = 0
+            async for page in self.client.iter_library_items(min_date_saved=since):
+                count(fetched=len(page))
+                await self._upsert_catalog_batch(page)
+                with phase("write"):
+                    await self.session.commit()
+                total_items += len(page)
 
-            await self.session.commit()
-            logger.info(f"Watch history sync complete for user {user_id}")
+            await self.sync_state.mark_synced(CATALOG_STATE_KEY, cursor=started_at, full=full)
+            with phase("write"):
+                await self.session.commit()
+            logger.info(f"Catalog sync complete ({total_items} items, {'full' if full else 'incremental'})")
+
+        except Exception as e:
+            logger.error(f"Error syncing catalog: {e}")
+            raise
+
+    async def sync_user_watch_history(self, user_id: str, full: bool = False) -> None:
+        """
+        Sync watch history for a specific user.
+        Only items touched since the last sync are fetched, unless a full
+        reconcile is requested or due.
+        """
+        try:
+            state_key = watch_history_state_key(user_id)
+            state = await self.sync_state.get(state_key)
+            started_at = datetime.now(zoneinfo.ZoneInfo("UTC"))
+            full = full or self.sync_state.needs_full_sync(state, started_at, self.full_sync_interval)
+            since = None if full or state is None else state.cursor - CURSOR_OVERLAP
+
+            logger.debug(f"Getting {'full' if full else 'incremental'} watch history for user {user_id}")
+            total_items = 0
+            total_rows = 0
+            timer_start = time.perf_counter()
+
+            # Upsert and commit each page as it arrives so memory stays bounded
+            async for page in self.client.iter_watch_history(user_id, min_date_saved=since):
+                count(fetched=len(page))
+                total_rows += await self._upsert_watch_history_batch(user_id, page)
+                with phase("write"):
+                    await self.session.commit()
+                total_items += len(page)
+
+            # Only advance the cursor once every page has been written
+            await self.sync_state.mark_synced(state_key, cursor=started_at, full=full)
+            with phase("write"):
+                await self.session.commit()
+
+            elapsed = time.perf_counter() - timer_start
+            logger.info(
+                f"Watch history sync complete for user {user_id} "
+                f"({total_items} items, {total_rows} rows written in {elapsed:.2f}s, "
+                f"{total_rows / elapsed if elapsed else 0:.0f} rows/s, {'full' if full else 'incremental'})"
+            )
 
         except Exception as e:
             logger.error(f"Error syncing watch history for user {user_id}: {e}")
             raise
 
-    async def _upsert_watch_history(self, user_id: str, item: JellyfinWatchItem) -> None:
+    async def sync_watch_items(self, user_id: str, items: List[JellyfinWatchItem]) -> int:
         """
-        Insert or update a watch history item
+        Write the current play state of specific items for a user, e.g. from webhooks.
+        Doesn't touch the sync cursor. Returns the number of rows written.
         """
-        if item.last_played_date is None:
-            logger.debug(f"Skipping item {item.item_name} - missing last_played_date")
-            return
+        count(fetched=len(items))
+        written = await self._upsert_watch_history_batch(user_id, items)
+        with phase("write"):
+            await self.session.commit()
+        return written
 
-        if item.tmdb_id:
+    async def _upsert_watch_history_batch(self, user_id: str, items: List[JellyfinWatchItem]) -> int:
+        """
+        Insert or update a batch of watch history items, chunk_size rows per statement.
+        Item metadata comes from the catalog. Returns the number of rows written.
+        """
+        played_items = []
+        for item in items:
+            if item.last_played_date is None:
+                logger.debug(f"Skipping item {item.item_name} - missing last_played_date")
+                count(skipped=1)
+                continue
+            played_items.append(item)
+
+        catalog = await self._get_catalog_items([item.item_id for item in played_items])
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        for item in played_items:
+            if (catalog_item := catalog.get(item.item_id)) is None:
+                logger.debug(f"Skipping item {item.item_name} - not in the library catalog")
+                count(skipped=1)
+                continue
+            # Keyed by item so a duplicate never hits the same row twice in one statement
+            rows[item.item_id] = self._watch_history_row(user_id, item, catalog_item)
+
+        # Sorted so concurrent writers lock rows in the same order
+        watch_rows = [rows[item_id] for item_id in sorted(rows)]
+        for offset in range(0, len(watch_rows), self.chunk_size):
+            chunk = watch_rows[offset:offset + self.chunk_size]
             try:
-                # Get or fetch TMDB data
-                await self.tmdb_service.get_or_fetch_media(
-                    item.tmdb_id,
-                    "movie" if item.item_type.lower() == "movie" else "tv"
-                )
-                logger.debug(f"Retrieved TMDB info for {item.item_name}")
+                with phase("write"):
+                    inserted, updated = await execute_counted(self.session, WATCH_HISTORY_UPSERT, chunk)
+                count(inserted=inserted, updated=updated)
+                logger.debug(f"Upserted {len(chunk)} watch history rows for user {user_id}")
+
             except Exception as e:
-                logger.warning(f"Failed to fetch TMDB data for {item.item_name}: {e}")
+                logger.error(f"Error upserting {len(chunk)} watch history rows for user {user_id}: {e}")
+                raise
+
+        return len(watch_rows)
+
+    async def _get_catalog_items(self, item_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get catalog metadata for items in one query.
+        Items the catalog doesn't know yet are fetched from Jellyfin and added.
+        """
+        if not item_ids:
+            return {}
+
+        result = await self.session.execute(
+            select(MediaItem.item_id, *(getattr(MediaItem, column) for column in CATALOG_COLUMNS))
+            .where(MediaItem.item_id == any_(bindparam("item_ids", item_ids, type_=ARRAY(String))))
+        )
+        catalog = {row["item_id"]: dict(row) for row in result.mappings()}
+
+        missing = [item_id for item_id in dict.fromkeys(item_ids) if item_id not in catalog]
+        if missing:
+            logger.debug(f"Adding {len(missing)} new items to the catalog")
+            catalog.update(await self._upsert_catalog_batch(
+                await self.client.get_library_items(missing)
+            ))
+
+        return catalog
+
+    async def _upsert_catalog_batch(self, items: List[JellyfinLibraryItem]) -> Dict[str, Dict[str, Any]]:
+        """
+        Enrich and upsert a batch of catalog items, chunk_size rows per statement.
+        Returns the written rows by item id.
+        """
+        await self._resolve_tmdb(items)
+
+        # Keyed by item so a duplicate never hits the same row twice in one statement
+        rows = {item.item_id: self._catalog_row(item) for item in items}
+        # Sorted so concurrent writers (crawl, on-demand fallbacks, webhooks) lock rows in the same order
+        catalog_rows = [rows[item_id] for item_id in sorted(rows)]
+        for offset in range(0, len(catalog_rows), self.chunk_size):
+            with phase("write"):
+                inserted, updated = await execute_counted(
+                    self.session, MEDIA_ITEM_UPSERT, catalog_rows[offset:offset + self.chunk_size]
+                )
+            count(inserted=inserted, updated=updated)
+
+        return rows
+
+    async def _resolve_tmdb(self, items: List[JellyfinLibraryItem]) -> None:
+        """
+        Make sure TMDB data exists for every item in one batch,
+        and clear the tmdb_id of items we couldn't get data for.
+        Episodes are enriched from their series.
+        """
+        with phase("enrich"):
+            await self._resolve_series(items)
+
+        tmdb_media = await self.tmdb_service.get_or_fetch_many(
+            (item.tmdb_id, "movie" if item.item_type.lower() == "movie" else "tv")
+            for item in items if item.tmdb_id
+        )
+
+        for item in items:
+            if item.tmdb_id and item.tmdb_id not in tmdb_media:
+                logger.debug(f"No TMDB data for {item.item_name}")
                 # If we can't get TMDB data, set tmdb_id to None
                 item.tmdb_id = None
 
-        try:
-            watch_data = {
-                "user_id": user_id,
-                "item_id": item.item_id,
-                "item_name": item.item_name,
-                "item_type": item.item_type,
-                "tmdb_id": item.tmdb_id,
-                "imdb_id": item.imdb_id,
-                "genres": item.genres or [],
-                "played_percentage": item.played_percentage,
-                "play_count": item.play_count,
-                "last_played_date": item.last_played_date,
-                "is_played": item.is_played,
-                "runtime_ticks": item.runtime_ticks,
-                "production_year": item.production_year,
-            }
+    async def _resolve_series(self, items: List[JellyfinLibraryItem]) -> None:
+        """
+        Replace each episode's own TMDB id with its series' TMDB id.
+        Each series is looked up in Jellyfin once, then cached.
+        """
+        episodes = [item for item in items if item.item_type.lower() == "episode"]
+        if not episodes:
+            return
 
-            stmt = insert(JellyfinWatchHistory).values(**watch_data)
-            stmt = stmt.on_conflict_do_update(
-                constraint='uq_user_item',
-                set_=watch_data
-            )
+        series_ids = {item.series_id for item in episodes if item.series_id}
+        resolved: Dict[str, int] = {}
+        for series_id in series_ids:
+            if (tmdb_id := series_tmdb_ids.get(series_id)) is not None:
+                resolved[series_id] = tmdb_id
 
-            await self.session.execute(stmt)
-            logger.debug(f"Upserted watch history for item: {item.item_name}")
+        missing = sorted(series_ids - resolved.keys())
+        if missing:
+            try:
+                fetched = await self.client.get_series_tmdb_ids(missing)
+                for series_id in missing:
+                    resolved[series_id] = fetched.get(series_id) or NO_TMDB_ID
+                    series_tmdb_ids.set(series_id, resolved[series_id])
 
-        except Exception as e:
-            logger.error(f"Error upserting watch history for item {item.item_name}: {e}")
-            raise
+            except Exception as e:
+                logger.warning(f"Failed to look up {len(missing)} series in Jellyfin: {e}")
+
+        for item in episodes:
+            series_tmdb_id = resolved.get(item.series_id) if item.series_id else None
+            item.tmdb_id = series_tmdb_id or None
+
+    def _catalog_row(self, item: JellyfinLibraryItem) -> Dict[str, Any]:
+        """
+        Build the media_items row for an item
+        """
+        return {
+            "item_id": item.item_id,
+            "item_name": item.item_name,
+            "item_type": item.item_type,
+            "series_id": item.series_id,
+            "series_name": item.series_name,
+            "tmdb_id": item.tmdb_id,
+            "imdb_id": item.imdb_id,
+            "genres": item.genres or [],
+            "runtime_ticks": item.runtime_ticks,
+            "production_year": item.production_year,
+        }
+
+    def _watch_history_row(self, user_id: str, item: JellyfinWatchItem, catalog_item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the watch_history row for an item from the user's play state
+        and the catalog metadata
+        """
+        return {
+            "user_id": user_id,
+            "item_id": item.item_id,
+            **{column: catalog_item[column] for column in CATALOG_COLUMNS},
+            "genres": catalog_item["genres"] or [],
+            "played_percentage": item.played_percentage,
+            "play_count": item.play_count,
+            "last_played_date": item.last_played_date,
+            "is_played": item.is_played,
+        }
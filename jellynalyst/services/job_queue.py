@@ -0,0 +1,155 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timedelta
+from typing import List
+import logging
+import zoneinfo
+
+from ..database import SyncJob, SyncJobStatus
+
+logger = logging.getLogger(__name__)
+
+# Predicate of the uq_sync_jobs_active partial index. Literal, so Postgres
+# can match it to the index when inferring the ON CONFLICT target.
+ACTIVE_JOB_PREDICATE = text("status IN ('PENDING', 'RUNNING')")
+
+class JobQueue:
+    """
+    Durable queue of sync jobs in Postgres.
+    Any number of workers can claim from it, SKIP LOCKED keeps them off each other's rows.
+    Every method commits, so claims and results are visible to other workers right away.
+    Completing, failing and extending a job only touch it while the worker still holds it.
+    """
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(self, job_type: str, user_ids: List[str], max_attempts: int = 5) -> int:
+        """
+        Queue a job per user. Users that already have a pending or running
+        job of this type are skipped. Returns the number of jobs queued.
+        """
+        if not user_ids:
+            return 0
+
+        result = await self.session.execute(
+            insert(SyncJob)
+            .values([
+                {"job_type": job_type, "user_id": user_id, "max_attempts": max_attempts,
+                 "status": SyncJobStatus.PENDING, "attempts": 0}
+                for user_id in user_ids
+            ])
+            .on_conflict_do_nothing(
+                index_elements=["job_type", "user_id"],
+                index_where=ACTIVE_JOB_PREDICATE
+            )
+            .returning(SyncJob.id)
+        )
+        queued = len(result.all())
+        await self.session.commit()
+        return queued
+
+    async def claim(
+        self,
+        worker_id: str,
+        job_types: List[str],
+        limit: int,
+        visibility_timeout: timedelta
+    ) -> List[SyncJob]:
+        """
+        Claim up to limit due jobs. A claimed job is invisible to other workers
+        until visibility_timeout passes, after which it's assumed its worker died.
+        """
+        now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        await self._fail_abandoned(now)
+
+        claimable = (
+            select(SyncJob.id)
+            .where(
+                SyncJob.job_type.in_(job_types),
+                or_(
+                    and_(SyncJob.status == SyncJobStatus.PENDING, SyncJob.run_after <= now),
+                    and_(SyncJob.status == SyncJobStatus.RUNNING, SyncJob.locked_until < now),
+                )
+            )
+            .order_by(SyncJob.run_after)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.scalars(
+            update(SyncJob)
+            .where(SyncJob.id.in_(claimable.scalar_subquery()))
+            .values(
+                status=SyncJobStatus.RUNNING,
+                attempts=SyncJob.attempts + 1,
+                locked_by=worker_id,
+                locked_until=now + visibility_timeout
+            )
+            .returning(SyncJob),
+            execution_options={"populate_existing": True}
+        )
+        jobs = list(result.all())
+        await self.session.commit()
+        return jobs
+
+    async def complete(self, job: SyncJob, worker_id: str) -> bool:
+        """Remove a finished job. Returns False if another worker has taken it over"""
+        result = await self.session.execute(
+            delete(SyncJob).where(SyncJob.id == job.id, SyncJob.locked_by == worker_id)
+        )
+        await self.session.commit()
+        return result.rowcount > 0
+
+    async def extend(self, job: SyncJob, worker_id: str, visibility_timeout: timedelta) -> bool:
+        """
+        Push a running job's visibility timeout forward, so long syncs aren't claimed again.
+        Returns False if another worker has taken it over.
+        """
+        result = await self.session.execute(
+            update(SyncJob)
+            .where(
+                SyncJob.id == job.id,
+                SyncJob.status == SyncJobStatus.RUNNING,
+                SyncJob.locked_by == worker_id
+            )
+            .values(locked_until=func.now() + visibility_timeout)
+        )
+        await self.session.commit()
+        return result.rowcount > 0
+
+    async def fail(self, job: SyncJob, worker_id: str, error: str, retry_base: float, max_backoff: float) -> bool:
+        """
+        Record a failed attempt. The job is retried with exponential backoff
+        until it runs out of attempts, then kept as failed.
+        Returns False if another worker has taken it over.
+        """
+        if job.attempts >= job.max_attempts:
+            values = {"status": SyncJobStatus.FAILED}
+            logger.error(f"Sync job {job.job_type} for user {job.user_id} failed for good after {job.attempts} attempts: {error}")
+        else:
+            delay = min(retry_base * 2 ** (job.attempts - 1), max_backoff)
+            values = {
+                "status": SyncJobStatus.PENDING,
+                "run_after": func.now() + timedelta(seconds=delay),
+            }
+            logger.warning(f"Sync job {job.job_type} for user {job.user_id} failed, retrying in {delay:.0f}s: {error}")
+
+        result = await self.session.execute(
+            update(SyncJob)
+            .where(SyncJob.id == job.id, SyncJob.locked_by == worker_id)
+            .values(**values, locked_by=None, locked_until=None, last_error=error)
+        )
+        await self.session.commit()
+        return result.rowcount > 0
+
+    async def _fail_abandoned(self, now: datetime) -> None:
+        """Give up on timed out jobs that have no attempts left, so they don't get claimed forever"""
+        await self.session.execute(
+            update(SyncJob)
+            .where(
+                SyncJob.status == SyncJobStatus.RUNNING,
+                SyncJob.locked_until < now,
+                SyncJob.attempts >= SyncJob.max_attempts
+            )
+            .values(status=SyncJobStatus.FAILED, last_error="Visibility timeout expired")
+        )
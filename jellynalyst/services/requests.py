@@ -1,40 +1,97 @@
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert
+import logging
 import zoneinfo
 
 from ..api.jellyseerr import JellyseerrRequest, RequestStatus as JellyseerrStatus
-from ..database import MediaRequest, RequestStatus as DBRequestStatus
+from ..database import MediaRequest, TMDBMedia, RequestStatus as DBRequestStatus
 from ..services.tmdb import TMDBService
+from ..services.sync_runs import INSERTED, execute_counted
+from ..sync_stats import count, phase
+
+logger = logging.getLogger(__name__)
+
+# Built once and executed with a list of rows (multi-row INSERT ... VALUES)
+_request_insert = insert(MediaRequest)
+REQUEST_UPSERT = _request_insert.on_conflict_do_update(
+    index_elements=["jellyseerr_id"],
+    set_={
+        column: _request_insert.excluded[column]
+        for column in (
+            "tmdb_id", "media_type", "title", "request_date", "status",
+            "requester", "genres", "is_deleted", "last_checked",
+        )
+    }
+).returning(INSERTED)
 
 class RequestService:
-    def __init__(self, session: AsyncSession, tmdb_service: TMDBService):
+    def __init__(self, session: AsyncSession, tmdb_service: TMDBService, chunk_size: int = 500):
         self.session = session
         self.tmdb_service = tmdb_service
+        self.chunk_size = chunk_size
 
-    async def sync_requests(self, jellyseerr_requests: List[JellyseerrRequest]) -> None:
+    async def sync_requests(self, jellyseerr_requests: List[JellyseerrRequest], reconcile: bool = True) -> None:
         """
-        Sync requests from Jellyseerr to the database
+        Sync requests from Jellyseerr to the database in a single transaction.
+        With reconcile, jellyseerr_requests must be the full list, and requests
+        missing from it are marked as deleted.
         """
-        # Get all existing requests
-        existing_ids = await self._get_existing_request_ids()
+        # Overlapping pages can return a request twice, keep the latest version,
+        # so a duplicate never hits the same row twice in one statement
+        unique_requests: Dict[int, JellyseerrRequest] = {}
+        for request in jellyseerr_requests:
+            seen = unique_requests.get(request.id)
+            if seen is None or request.updatedAt >= seen.updatedAt:
+                unique_requests[request.id] = request
+        jellyseerr_requests = list(unique_requests.values())
+
+        # Resolve TMDB metadata for every distinct title once
+        tmdb_media = await self.tmdb_service.get_or_fetch_many(
+            (request.media.tmdbId, request.type) for request in jellyseerr_requests
+        )
 
-        # Process each request
+        # Build all rows in memory, then write them in chunks
+        now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        rows = []
         for request in jellyseerr_requests:
-            await self._upsert_request(request)
+            tmdb_info = tmdb_media.get(request.media.tmdbId)
+            if tmdb_info is None:
+                logger.warning(f"Skipping request {request.id} - no TMDB data for {request.media.tmdbId}")
+                count(skipped=1)
+                continue
+            rows.append(self._request_row(request, tmdb_info, now))
 
-        # Mark requests as deleted if they no longer exist in Jellyseerr
-        current_ids = {req.id for req in jellyseerr_requests}
-        deleted_ids = existing_ids - current_ids
+        await self._upsert_requests(rows)
 
-        if deleted_ids:
-            await self._mark_requests_deleted(deleted_ids)
+        if reconcile:
+            # Mark requests as deleted if they no longer exist in Jellyseerr
+            existing_ids = await self._get_existing_request_ids()
+            current_ids = set(unique_requests)
+            deleted_ids = existing_ids - current_ids
+
+            if deleted_ids:
+                await self._mark_requests_deleted(deleted_ids)
+                count(updated=len(deleted_ids))
 
         # Commit the transaction
-        await self.session.commit()
+        with phase("write"):
+            await self.session.commit()
+
+
+    async def sync_request(self, request_id: int, request: JellyseerrRequest | None) -> None:
+        """
+        Sync a single request, e.g. from a webhook.
+        A request that no longer exists in Jellyseerr (None) is marked as deleted.
+        """
+        if request is None:
+            await self._mark_requests_deleted({request_id})
+        else:
+            await self._upsert_request(request)
 
+        await self.session.commit()
 
     async def _get_existing_request_ids(self) -> set[int]:
         """
@@ -51,30 +108,37 @@ class RequestService:
             request.media.tmdbId, request.type
         )
 
-        status = self._map_status(request.status)
         now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        await self._upsert_requests([self._request_row(request, tmdb_info, now)])
 
-        # Prepare the request data
-        request_data = {
+    async def _upsert_requests(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert or update request rows, chunk_size rows per statement
+        """
+        for offset in range(0, len(rows), self.chunk_size):
+            with phase("write"):
+                inserted, updated = await execute_counted(
+                    self.session, REQUEST_UPSERT, rows[offset:offset + self.chunk_size]
+                )
+            count(inserted=inserted, updated=updated)
+
+    def _request_row(self, request: JellyseerrRequest, tmdb_info: TMDBMedia, now: datetime) -> Dict[str, Any]:
+        """
+        Build the media_requests row for a request
+        """
+        return {
             "jellyseerr_id": request.id,
             "tmdb_id": request.media.tmdbId,
             "media_type": request.type,
             "title": tmdb_info.title, # TODO: Fetch tmdb titles
             "request_date": request.createdAt,
-            "status": status,
+            "status": self._map_status(request.status),
             "requester": request.requestedBy.displayName,
             "genres": tmdb_info.genres,
             "is_deleted": False,
             "last_checked": now,
         }
 
-        stmt = insert(MediaRequest).values(**request_data)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["jellyseerr_id"], set_=request_data
-        )
-
-        await self.session.execute(stmt)
-
     def _map_status(self, jellyseerr_status: JellyseerrStatus) -> DBRequestStatus:
         """Map Jellyseerr status to database status"""
         status_map = {
@@ -0,0 +1,137 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import delete, literal_column, select
+from sqlalchemy.sql import Executable
+from contextlib import asynccontextmanager
+from contextvars import Token
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Tuple
+import asyncio
+import logging
+import zoneinfo
+
+from ..database import SyncRun
+from ..metrics import observe_sync_run
+from ..sync_stats import RunStats, current_run
+
+logger = logging.getLogger(__name__)
+
+# Add to an upsert's RETURNING to tell inserted rows from updated ones.
+# xmax is 0 for a freshly inserted row version, set when ON CONFLICT updated it.
+INSERTED = literal_column("(xmax = 0)").label("inserted")
+
+async def execute_counted(session: AsyncSession, stmt: Executable, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Execute an upsert returning INSERTED for a list of rows.
+    Returns how many rows were inserted and how many updated.
+    """
+    result = await session.execute(stmt, rows)
+    flags = result.scalars().all()
+    inserted = sum(1 for flag in flags if flag)
+    return inserted, len(flags) - inserted
+
+class SyncRunService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def record(
+        self,
+        job: str,
+        user_id: str | None,
+        stats: RunStats,
+        started_at: datetime,
+        finished_at: datetime,
+        error: str | None = None
+    ) -> None:
+        """
+        Store a finished run
+        """
+        self.session.add(SyncRun(
+            job=job,
+            user_id=user_id,
+            status="failed" if error else "success",
+            error=error,
+            started_at=started_at,
+            finished_at=finished_at,
+            **{f"{name}_seconds": stats.phases[name] for name in ("fetch", "parse", "enrich", "write")},
+            **{f"items_{name}": stats.counts[name] for name in ("fetched", "inserted", "updated", "skipped")},
+            errors=stats.counts["errors"]
+        ))
+        await self.session.commit()
+
+    async def list_runs(self, job: str | None = None, user_id: str | None = None, limit: int = 50) -> List[SyncRun]:
+        """
+        Get the most recent runs, newest first
+        """
+        query = select(SyncRun).order_by(SyncRun.started_at.desc()).limit(limit)
+        if job is not None:
+            query = query.where(SyncRun.job == job)
+        if user_id is not None:
+            query = query.where(SyncRun.user_id == user_id)
+
+        result = await self.session.scalars(query)
+        return list(result.all())
+
+    async def prune(self, older_than: timedelta) -> int:
+        """
+        Delete runs started before the retention window. Returns how many were deleted.
+        """
+        cutoff = datetime.now(zoneinfo.ZoneInfo("UTC")) - older_than
+        result = await self.session.execute(delete(SyncRun).where(SyncRun.started_at < cutoff))
+        await self.session.commit()
+        return result.rowcount
+
+@asynccontextmanager
+async def track_sync_run(
+    session_maker: async_sessionmaker[AsyncSession],
+    job: str,
+    user_id: str | None = None
+) -> AsyncIterator[RunStats]:
+    """
+    Collect stats for the code inside the block and store them in the ledger.
+    A run started inside another run also adds its numbers to the outer run.
+    """
+    stats = RunStats(parent=current_run.get())
+    token = current_run.set(stats)
+    started_at = datetime.now(zoneinfo.ZoneInfo("UTC"))
+    error = None
+    try:
+        yield stats
+
+    except asyncio.CancelledError:
+        # Shutting down, don't hold it up to record a partial run
+        current_run.reset(token)
+        raise
+
+    except Exception as e:
+        stats.counts["errors"] += 1
+        error = str(e)
+        await _finish_run(session_maker, job, user_id, stats, token, started_at, error)
+        raise
+
+    else:
+        await _finish_run(session_maker, job, user_id, stats, token, started_at, error)
+
+async def _finish_run(
+    session_maker: async_sessionmaker[AsyncSession],
+    job: str,
+    user_id: str | None,
+    stats: RunStats,
+    token: Token[RunStats | None],
+    started_at: datetime,
+    error: str | None
+) -> None:
+    current_run.reset(token)
+    stats.merge_into_parent()
+    if stats.parent is None:
+        # Nested runs are already part of their parent's numbers
+        observe_sync_run(job, stats)
+    try:
+        async with session_maker() as session:
+            await SyncRunService(session).record(
+                job, user_id, stats, started_at,
+                finished_at=datetime.now(zoneinfo.ZoneInfo("UTC")),
+                error=error
+            )
+    except Exception as e:
+        # The ledger must never fail a sync
+        logger.warning(f"Failed to record {job} sync run: {e}")
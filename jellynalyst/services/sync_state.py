@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+import zoneinfo
+
+from ..database import SyncState
+
+class SyncStateService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, key: str) -> SyncState | None:
+        """
+        Get the stored sync state for a key
+        """
+        result = await self.session.execute(
+            select(SyncState).where(SyncState.key == key)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_many(self, keys: List[str]) -> Dict[str, SyncState]:
+        """
+        Get the stored sync state for several keys in one query
+        """
+        if not keys:
+            return {}
+
+        result = await self.session.execute(
+            select(SyncState).where(SyncState.key.in_(keys))
+        )
+        return {state.key: state for state in result.scalars()}
+
+    @staticmethod
+    def needs_full_sync(state: SyncState | None, now: datetime, full_sync_interval: timedelta) -> bool:
+        """
+        Whether the next sync should be a full reconcile rather than incremental
+        """
+        return state is None or state.cursor is None or (
+            state.last_full_sync_at is None
+            or now - state.last_full_sync_at > full_sync_interval
+        )
+
+    async def mark_synced(self, key: str, cursor: datetime | None, full: bool) -> None:
+        """
+        Record a successful sync and advance the cursor.
+        Does not commit, so the cursor only moves with the synced data.
+        """
+        now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        state_data = {
+            "key": key,
+            "cursor": cursor,
+            "last_synced_at": now,
+            "last_checked_at": now,
+        }
+        if full:
+            state_data["last_full_sync_at"] = now
+
+        stmt = insert(SyncState).values(**state_data)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_=state_data
+        )
+
+        await self.session.execute(stmt)
+
+    async def mark_checked(self, keys: List[str]) -> None:
+        """
+        Record that these keys were found up to date without syncing.
+        Does not commit.
+        """
+        if not keys:
+            return
+
+        await self.session.execute(
+            update(SyncState)
+            .where(SyncState.key.in_(keys))
+            .values(last_checked_at=datetime.now(zoneinfo.ZoneInfo("UTC")))
+        )
@@ -1,40 +1,298 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Integer, and_, any_, bindparam, delete, exists, inspect, select, tuple_, update
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+import asyncio
+import httpx
+import logging
+import zoneinfo
 
-from ..database import TMDBMedia
+from ..database import TMDBMedia, TMDBNegativeLookup
 from ..api.tmdb import TMDBClient
+from .cache import TTLCache
+from ..sync_stats import count, phase
+
+logger = logging.getLogger(__name__)
+
+# TMDB answers these for ids that don't exist or can't be looked up
+PERMANENT_FAILURE_STATUSES = (404, 422)
+
+# Column values of a tmdb_media row. The cache holds these rather than ORM
+# instances, which belong to the session that loaded them.
+MediaSnapshot = Dict[str, Any]
+
+# Process-wide cache in front of tmdb_media, shared by every TMDBService
+media_cache: TTLCache[int, MediaSnapshot] | None = None
+
+def init_media_cache(max_size: int, ttl: float) -> None:
+    """Initialize the global TMDB media cache"""
+    global media_cache
+    media_cache = TTLCache(max_size=max_size, ttl=ttl)
+
+def get_media_cache() -> TTLCache[int, MediaSnapshot]:
+    """Get the global TMDB media cache, creating a default one if needed"""
+    if media_cache is None:
+        init_media_cache(max_size=10000, ttl=3600)
+    assert media_cache is not None
+    return media_cache
+
+def media_snapshot(media: TMDBMedia) -> MediaSnapshot:
+    """Copy a row's column values, safe to share between sessions"""
+    snapshot = {attr.key: getattr(media, attr.key) for attr in inspect(TMDBMedia).column_attrs}
+    snapshot["genres"] = list(snapshot["genres"])
+    return snapshot
 
 class TMDBService:
-    def __init__(self, session: AsyncSession, tmdb_client: TMDBClient):
+    def __init__(self, session: AsyncSession, tmdb_client: TMDBClient,
+        cache: TTLCache[int, MediaSnapshot] | None = None,
+        negative_ttl: timedelta = timedelta(days=7)):
         self.session = session
         self.client = tmdb_client
+        self.cache = cache if cache is not None else get_media_cache()
+        self.negative_ttl = negative_ttl
 
     async def get_or_fetch_media(self, tmdb_id: int, media_type: str) -> TMDBMedia:
         """
-        Get media from db or try to fetch from TMDB
+        Get media from cache, db or try to fetch from TMDB.
+        Does not commit, so the caller controls the transaction.
+        """
+        snapshot = await self.cache.get_or_load(
+            tmdb_id, lambda: self._get_or_fetch(tmdb_id, media_type)
+        )
+        return await self._attach(snapshot)
+
+    async def get_or_fetch_many(self, keys: Iterable[Tuple[int, str]]) -> Dict[int, TMDBMedia]:
+        """
+        Get media for many (tmdb_id, media_type) pairs:
+        cache first, then one query for the rest, then one TMDB fetch per
+        missing id and a single bulk write. Stale rows are served as they are
+        and left to refresh_stale.
+        Ids that can't be fetched are left out of the result.
+        Does not commit, so the caller controls the transaction.
+        """
+        wanted = dict(keys)
+
+        async def load(tmdb_ids: List[int]) -> Dict[int, MediaSnapshot]:
+            loaded = await self._load_many({tmdb_id: wanted[tmdb_id] for tmdb_id in tmdb_ids})
+            return {tmdb_id: media_snapshot(media) for tmdb_id, media in loaded.items()}
+
+        with phase("enrich"):
+            # Ids another task is already loading are waited on, not loaded twice
+            snapshots = await self.cache.get_or_load_many(wanted, load)
+            return {tmdb_id: await self._attach(snapshot) for tmdb_id, snapshot in snapshots.items()}
+
+    async def refresh_stale(self, stale_after: timedelta, limit: int) -> int:
+        """
+        Refresh up to `limit` of the oldest rows not updated within `stale_after`.
+        Returns how many rows were refreshed. Does not commit.
+        """
+        now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        result = await self.session.execute(
+            select(TMDBMedia.id, TMDBMedia.media_type)
+            .where(TMDBMedia.last_updated < now - stale_after)
+            # Known-bad ids would otherwise sit at the front of the queue forever
+            .where(~exists().where(and_(
+                TMDBNegativeLookup.tmdb_id == TMDBMedia.id,
+                TMDBNegativeLookup.media_type == TMDBMedia.media_type,
+                TMDBNegativeLookup.expires_at > now
+            )))
+            .order_by(TMDBMedia.last_updated)
+            .limit(limit)
+        )
+        stale = {tmdb_id: media_type for tmdb_id, media_type in result.all()}
+        if not stale:
+            return 0
+
+        with phase("enrich"):
+            fetched = await self._fetch_many(stale)
+        refreshed = await self._store_many(list(fetched.values()))
+        for media in refreshed:
+            self.cache.set(media.id, media_snapshot(media))
+
+        count(fetched=len(stale), updated=len(refreshed), skipped=len(stale) - len(fetched))
+        return len(refreshed)
+
+    async def _load_many(self, wanted: Dict[int, str]) -> Dict[int, TMDBMedia]:
+        """
+        Load media from the db, then fetch and store whatever is missing,
+        skipping ids with an active negative entry.
+        Callers go through the cache, which stores the results.
+        """
+        media_by_id: Dict[int, TMDBMedia] = {}
+        wanted = dict(wanted)
+
+        # Load everything we already have in one query
+        result = await self.session.execute(
+            select(TMDBMedia).where(
+                TMDBMedia.id == any_(bindparam("tmdb_ids", list(wanted), type_=ARRAY(Integer)))
+            )
+        )
+        for media in result.scalars():
+            media_by_id[media.id] = media
+            del wanted[media.id]
+
+        if not wanted:
+            return media_by_id
+
+        # Don't ask TMDB again for ids we know will fail
+        for key in await self._suppress_known_failures(wanted):
+            del wanted[key[0]]
+
+        # Fetch only what's missing
+        fetched = await self._fetch_many(wanted)
+        for media in await self._store_many(list(fetched.values())):
+            media_by_id[media.id] = media
+
+        return media_by_id
+
+    async def _suppress_known_failures(self, wanted: Dict[int, str]) -> List[Tuple[int, str]]:
+        """
+        Find pairs with an active negative entry and count the skipped lookups
         """
-        # Check if media exists in db
+        now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        keys = list(wanted.items())
         result = await self.session.execute(
-            select(TMDBMedia).where(TMDBMedia.id == tmdb_id)
+            select(TMDBNegativeLookup.tmdb_id, TMDBNegativeLookup.media_type)
+            .where(tuple_(TMDBNegativeLookup.tmdb_id, TMDBNegativeLookup.media_type).in_(keys))
+            .where(TMDBNegativeLookup.expires_at > now)
+        )
+        suppressed = [(tmdb_id, media_type) for tmdb_id, media_type in result.all()]
+
+        if suppressed:
+            await self.session.execute(
+                update(TMDBNegativeLookup)
+                .where(tuple_(TMDBNegativeLookup.tmdb_id, TMDBNegativeLookup.media_type).in_(suppressed))
+                .values(suppressed_count=TMDBNegativeLookup.suppressed_count + 1)
+            )
+            logger.debug(f"Skipped {len(suppressed)} known-bad TMDB lookups")
+
+        return suppressed
+
+    async def _fetch_many(self, wanted: Dict[int, str]) -> Dict[int, Dict[str, Any]]:
+        """
+        Fetch details from TMDB for each id.
+        The client paces these to its rate limit and concurrency.
+        Permanent failures are recorded in the negative cache.
+        """
+        failures: Dict[Tuple[int, str], str] = {}
+
+        async def fetch(tmdb_id: int, media_type: str) -> Dict[str, Any] | None:
+            try:
+                return await self.client.get_media_details(tmdb_id, media_type)
+            except Exception as e:
+                logger.warning(f"Failed to fetch TMDB data for {media_type} {tmdb_id}: {e}")
+                if (reason := self._permanent_failure_reason(e)) is not None:
+                    failures[(tmdb_id, media_type)] = reason
+                return None
+
+        results = await asyncio.gather(*(
+            fetch(tmdb_id, media_type) for tmdb_id, media_type in wanted.items()
+        ))
+        fetched = {data["id"]: data for data in results if data is not None}
+
+        await self._record_failures(failures)
+        if fetched:
+            # Ids that work again no longer need their negative entry
+            await self.session.execute(
+                delete(TMDBNegativeLookup).where(
+                    tuple_(TMDBNegativeLookup.tmdb_id, TMDBNegativeLookup.media_type)
+                    .in_([(tmdb_id, wanted[tmdb_id]) for tmdb_id in fetched if tmdb_id in wanted])
+                )
+            )
+
+        return fetched
+
+    @staticmethod
+    def _permanent_failure_reason(error: Exception) -> str | None:
+        """
+        Why a lookup will keep failing, or None for transient errors worth retrying
+        """
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            # Only the id itself being unknown or invalid is permanent. Anything else,
+            # like a bad or revoked API key (401/403), would hide every id it touched.
+            if status in PERMANENT_FAILURE_STATUSES:
+                return f"HTTP {status}"
+            return None
+
+        if isinstance(error, (KeyError, ValueError, TypeError)):
+            return f"Unparseable response: {error!r}"[:255]
+
+        return None
+
+    async def _record_failures(self, failures: Dict[Tuple[int, str], str]) -> None:
+        """
+        Upsert negative entries for permanently failed lookups
+        """
+        if not failures:
+            return
+
+        now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        rows = [
+            {
+                "tmdb_id": tmdb_id,
+                "media_type": media_type,
+                "reason": reason,
+                "failure_count": 1,
+                "suppressed_count": 0,
+                "last_failed_at": now,
+                "expires_at": now + self.negative_ttl,
+            }
+            for (tmdb_id, media_type), reason in sorted(failures.items())
+        ]
+
+        stmt = insert(TMDBNegativeLookup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tmdb_id", "media_type"],
+            set_={
+                "reason": stmt.excluded.reason,
+                "failure_count": TMDBNegativeLookup.failure_count + 1,
+                "last_failed_at": stmt.excluded.last_failed_at,
+                "expires_at": stmt.excluded.expires_at,
+            }
         )
-        media = result.scalar_one_or_none()
+        await self.session.execute(stmt, rows)
+        logger.info(f"Recorded {len(rows)} failed TMDB lookups in the negative cache")
 
-        # If not found or outdated, fetch from TMDB
-        # TODO: Add a check for outdated media
-        if not media or (
-            datetime.now(media.last_updated.tzinfo) - media.last_updated > timedelta(days=7)
-        ):
-            data = await self.client.get_media_details(tmdb_id, media_type)
+    async def _store_many(self, rows: List[Dict[str, Any]]) -> List[TMDBMedia]:
+        """
+        Upsert fetched media in one statement and return the stored rows
+        """
+        if not rows:
+            return []
 
-            if media:
-                for key, value in data.items():
-                    setattr(media, key, value)
+        # Sorted so concurrent syncs lock rows in the same order
+        rows = sorted(rows, key=lambda row: row["id"])
+        stmt = insert(TMDBMedia)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={column: stmt.excluded[column] for column in rows[0] if column != "id"}
+        ).returning(TMDBMedia)
 
-            else:
-                media = TMDBMedia(**data)
-                self.session.add(media)
+        with phase("write"):
+            result = await self.session.scalars(
+                stmt, rows, execution_options={"populate_existing": True}
+            )
+            return list(result.all())
 
-            await self.session.commit()
+    async def _get_or_fetch(self, tmdb_id: int, media_type: str) -> MediaSnapshot:
+        """
+        Get media from db, fetching it from TMDB only if missing.
+        Outdated rows are served as they are and left to refresh_stale.
+        """
+        media = (await self._load_many({tmdb_id: media_type})).get(tmdb_id)
+        if media is None:
+            raise LookupError(f"No TMDB data for {media_type} {tmdb_id}")
 
-        return media
+        return media_snapshot(media)
+
+    async def _attach(self, snapshot: MediaSnapshot) -> TMDBMedia:
+        """
+        Get this session's instance for a cached row, without querying.
+        Reuses the instance if the session already has the row loaded.
+        """
+        media = TMDBMedia(**{**snapshot, "genres": list(snapshot["genres"])})
+        make_transient_to_detached(media)
+        return await self.session.merge(media, load=False)
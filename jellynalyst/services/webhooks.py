@@ -0,0 +1,101 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, Set
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Jellyfin Webhook plugin notifications that change a user's play state
+WATCH_EVENT_TYPES = ("PlaybackStop", "PlaybackProgress", "UserDataSaved")
+
+class JellyfinWebhookEvent(BaseModel):
+    """
+    Payload sent by the Jellyfin Webhook plugin.
+    Only the fields we need, the template may send more.
+    """
+    model_config = ConfigDict(extra="ignore")
+
+    NotificationType: str
+    ItemId: str
+    UserId: str
+
+# Jellyseerr notifications about a request. The stock agents have no
+# deletion event, a deleted request is noticed when fetching it returns 404.
+REQUEST_EVENT_TYPES = (
+    "MEDIA_PENDING", "MEDIA_APPROVED", "MEDIA_AUTO_APPROVED",
+    "MEDIA_AVAILABLE", "MEDIA_DECLINED", "MEDIA_FAILED",
+)
+
+class JellyseerrWebhookRequest(BaseModel):
+    """The {{request}} block of a Jellyseerr webhook payload"""
+    model_config = ConfigDict(extra="ignore")
+
+    request_id: int
+
+class JellyseerrWebhookEvent(BaseModel):
+    """
+    Payload sent by the Jellyseerr webhook agent with its default template.
+    Only the fields we need.
+    """
+    model_config = ConfigDict(extra="ignore")
+
+    notification_type: str
+    request: JellyseerrWebhookRequest | None = None
+
+class WatchEventQueue:
+    """
+    Bounded queue of (user id, item id) play state changes,
+    drained in micro-batches by the ingest task
+    """
+    def __init__(self, max_size: int):
+        self._queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue(maxsize=max_size)
+
+    def submit(self, event: JellyfinWebhookEvent) -> None:
+        """
+        Queue an event without waiting.
+        Raises asyncio.QueueFull when ingest can't keep up.
+        """
+        self._queue.put_nowait((event.UserId, event.ItemId))
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    async def next_batch(self, max_items: int, window: float) -> Dict[str, Set[str]]:
+        """
+        Wait for an event, then keep collecting for up to window seconds or max_items events.
+        Returns item ids by user, so repeated progress events for an item collapse into one.
+        """
+        batch: Dict[str, Set[str]] = {}
+        user_id, item_id = await self._queue.get()
+        batch.setdefault(user_id, set()).add(item_id)
+        collected = 1
+
+        deadline = time.monotonic() + window
+        while collected < max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                user_id, item_id = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.setdefault(user_id, set()).add(item_id)
+            collected += 1
+
+        return batch
+
+# Process-wide queue between the webhook route and the ingest task
+watch_events: WatchEventQueue | None = None
+
+def init_watch_events(max_size: int) -> None:
+    """Initialize the global watch event queue"""
+    global watch_events
+    watch_events = WatchEventQueue(max_size=max_size)
+
+def get_watch_events() -> WatchEventQueue:
+    """Get the global watch event queue, creating a default one if needed"""
+    if watch_events is None:
+        init_watch_events(max_size=10000)
+    assert watch_events is not None
+    return watch_events
@@ -0,0 +1,76 @@
+"""
+Per-run sync statistics: phase timings and item counts.
+
+A run's stats live in a context variable, so API clients and services can
+report into whatever run is active without passing it around. Outside a
+run, phase() and count() do nothing.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Tuple
+import time
+
+PHASES = ("fetch", "parse", "enrich", "write")
+COUNTERS = ("fetched", "inserted", "updated", "skipped", "errors")
+
+class RunStats:
+    """
+    Timings and counts for one sync run.
+    Phase times are summed over concurrent work, so they can add up to more than the run took.
+    """
+    def __init__(self, parent: "RunStats | None" = None):
+        self.parent = parent
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+
+    def merge_into_parent(self) -> None:
+        """Add this run's numbers to the run it was started from, if any"""
+        if self.parent is None:
+            return
+        for name, seconds in self.phases.items():
+            self.parent.phases[name] += seconds
+        for name, value in self.counts.items():
+            self.parent.counts[name] += value
+
+current_run: ContextVar[RunStats | None] = ContextVar("current_sync_run", default=None)
+
+# Phase running in the current task, with when it (re)started
+_active_phase: ContextVar[Tuple[str, float] | None] = ContextVar("active_sync_phase", default=None)
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Time a block as part of a phase of the current run.
+    A nested phase pauses the outer one, so no time is counted twice.
+    Must not wrap a yield, e.g. in an async generator.
+    """
+    stats = current_run.get()
+    if stats is None:
+        yield
+        return
+
+    outer = _active_phase.get()
+    started = time.perf_counter()
+    if outer is not None:
+        stats.phases[outer[0]] += started - outer[1]
+
+    token = _active_phase.set((name, started))
+    try:
+        yield
+    finally:
+        finished = time.perf_counter()
+        # A nested phase may have restarted our clock
+        active = _active_phase.get()
+        stats.phases[name] += finished - (active[1] if active is not None else started)
+        _active_phase.reset(token)
+        if outer is not None:
+            _active_phase.set((outer[0], finished))
+
+def count(**counts: int) -> None:
+    """Add to the current run's counters, e.g. count(fetched=100)"""
+    stats = current_run.get()
+    if stats is None:
+        return
+    for name, value in counts.items():
+        stats.counts[name] += value
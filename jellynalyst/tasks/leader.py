@@ -0,0 +1,106 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from typing import Awaitable, Callable
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LeaderElection:
+    """
+    Elects one process to run the sync jobs using a Postgres session-level
+    advisory lock. The lock lives as long as the connection that took it,
+    so when the leader dies, Postgres releases it and another process takes over.
+    """
+    def __init__(self, engine: AsyncEngine, lock_id: int, check_interval: float = 15.0):
+        self.engine = engine
+        self.lock_id = lock_id
+        self.check_interval = check_interval
+        self.is_leader = False
+        self._connection: AsyncConnection | None = None
+
+    async def run(
+        self,
+        on_elected: Callable[[], Awaitable[None] | None],
+        on_demoted: Callable[[], Awaitable[None] | None]
+    ) -> None:
+        """
+        Campaign for leadership forever. Calls on_elected when the lock is won,
+        and on_demoted if the lock's connection is lost.
+        """
+        try:
+            while True:
+                try:
+                    if not self.is_leader and await self._try_acquire():
+                        self.is_leader = True
+                        logger.info(f"Elected sync leader (lock {self.lock_id})")
+                        await _maybe_await(on_elected())
+                    elif self.is_leader:
+                        await self._check_connection()
+
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Lost leader election connection: {e}")
+                    await self._close_connection()
+                    if self.is_leader:
+                        self.is_leader = False
+                        logger.warning("Stepping down as sync leader")
+                        await _maybe_await(on_demoted())
+
+                await asyncio.sleep(self.check_interval)
+
+        finally:
+            if self.is_leader:
+                self.is_leader = False
+                await _maybe_await(on_demoted())
+            await self._release()
+
+    async def _try_acquire(self) -> bool:
+        if self._connection is None:
+            # Autocommit, so the connection never sits idle in a transaction
+            connection = await self.engine.connect()
+            self._connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+
+        return bool(await self._connection.scalar(
+            text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id}
+        ))
+
+    async def _check_connection(self) -> None:
+        """Make sure the connection holding the lock is still alive"""
+        assert self._connection is not None
+        await self._connection.scalar(text("SELECT 1"))
+
+    async def _release(self) -> None:
+        """Give up the lock so another process can take over right away"""
+        if self._connection is None:
+            return
+        released = False
+        try:
+            released = bool(await self._connection.scalar(
+                text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self.lock_id}
+            ))
+        except Exception as e:
+            logger.warning(f"Error releasing leader lock: {e}")
+        finally:
+            # Only a connection known to be unlocked may go back to the pool
+            await self._close_connection(invalidate=not released)
+
+    async def _close_connection(self, invalidate: bool = True) -> None:
+        """
+        Close the lock connection. Unless told otherwise, the underlying connection
+        is discarded rather than pooled, since it may still hold the lock.
+        """
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        try:
+            if invalidate:
+                await connection.invalidate()
+            await connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing leader election connection: {e}")
+
+async def _maybe_await(result: Awaitable[None] | None) -> None:
+    if result is not None:
+        await result
@@ -0,0 +1,263 @@
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+import asyncio
+import logging
+import random
+import time
+import zoneinfo
+
+from ..metrics import SYNC_JOB_DURATION, SYNC_JOB_LAST_SUCCESS
+
+logger = logging.getLogger(__name__)
+
+UTC = zoneinfo.ZoneInfo("UTC")
+
+class CronSchedule:
+    """
+    Minimal five field cron expression (minute hour day month weekday), in UTC.
+    Fields accept *, numbers, ranges (a-b), steps (*/n, a-b/n) and lists.
+    Weekdays run from 0 (Sunday) to 6.
+    """
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: {expression!r}")
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(field, low, high)
+            for field, (low, high) in zip(fields, self.FIELD_RANGES)
+        )
+        # Like cron, if both day fields are restricted either one may match
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            value_range, _, step = part.partition("/")
+            if value_range == "*":
+                start, end = low, high
+            elif "-" in value_range:
+                start_str, end_str = value_range.split("-", 1)
+                start, end = int(start_str), int(end_str)
+            else:
+                start = end = int(value_range)
+                if step:
+                    end = high
+
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Get the first matching minute strictly after moment"""
+        candidate = moment.astimezone(UTC).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Skip whole months, days and hours that can't match
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression {self.expression!r} never matches")
+
+class Job:
+    """
+    A periodic job run by the Scheduler, on an interval or a cron schedule.
+    Only one run of a job happens at a time.
+    """
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float | None = None,
+        cron: str | None = None,
+        jitter: float = 0.0,
+        retry_base: float = 30.0,
+        max_backoff: float = 3600.0,
+        depends_on: Tuple[str, ...] = ()
+    ):
+        if interval is None and cron is None:
+            raise ValueError(f"Job {name} needs an interval or a cron expression")
+
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = CronSchedule(cron) if cron else None
+        self.jitter = jitter
+        self.retry_base = retry_base
+        self.max_backoff = max_backoff
+        self.depends_on = depends_on
+
+        self.running = False
+        self.failures = 0
+        self.last_started: datetime | None = None
+        self.last_finished: datetime | None = None
+        self.last_success: datetime | None = None
+        self.last_duration: float | None = None
+        self.last_error: str | None = None
+        self.next_run: datetime | None = None
+
+        self._lock = asyncio.Lock()
+        self._trigger = asyncio.Event()
+        self._succeeded = asyncio.Event()
+
+    def next_delay(self, now: datetime, first: bool = False) -> float:
+        """
+        Seconds until the next run. Failures back off exponentially from retry_base.
+        Jitter is added on top so jobs don't line up against the same upstream.
+        """
+        if self.failures:
+            delay = min(self.retry_base * 2 ** (self.failures - 1), self.max_backoff)
+        elif self.cron is not None:
+            delay = (self.cron.next_after(now) - now).total_seconds()
+        elif first:
+            # Interval jobs start right away, spread over the jitter window
+            delay = 0.0
+        else:
+            assert self.interval is not None
+            delay = self.interval
+
+        return delay + random.uniform(0, self.jitter)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "schedule": self.cron.expression if self.cron else f"every {self.interval:g}s",
+            "depends_on": list(self.depends_on),
+            "running": self.running,
+            "failures": self.failures,
+            "last_started": self.last_started,
+            "last_finished": self.last_finished,
+            "last_success": self.last_success,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "next_run": self.next_run,
+        }
+
+class Scheduler:
+    """
+    Runs periodic jobs, each in its own task.
+    Jobs wait for their dependencies to have succeeded once and to not be running.
+    """
+    def __init__(self) -> None:
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task[None]] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def add_job(self, job: Job) -> None:
+        if job.name in self.jobs:
+            raise ValueError(f"Job {job.name} is already scheduled")
+        self.jobs[job.name] = job
+
+    def start(self) -> None:
+        """Start a task per job"""
+        for job in self.jobs.values():
+            missing = [name for name in job.depends_on if name not in self.jobs]
+            if missing:
+                raise ValueError(f"Job {job.name} depends on unknown jobs: {', '.join(missing)}")
+
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._run_forever(job), name=f"job:{job.name}"))
+        logger.info(f"Scheduler started with jobs: {', '.join(self.jobs)}")
+
+    async def stop(self) -> None:
+        """Cancel all job tasks and wait for them to finish"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        logger.info("Scheduler stopped")
+
+    def run_now(self, name: str) -> Job:
+        """
+        Trigger a job without waiting for its schedule.
+        A job that is already running runs again once it finishes.
+        """
+        job = self.jobs[name]
+        job._trigger.set()
+        return job
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [job.status() for job in self.jobs.values()]
+
+    async def _run_forever(self, job: Job) -> None:
+        first = True
+        while True:
+            delay = job.next_delay(datetime.now(UTC), first=first)
+            first = False
+            job.next_run = datetime.now(UTC) + timedelta(seconds=delay)
+
+            try:
+                await asyncio.wait_for(job._trigger.wait(), timeout=delay)
+                logger.info(f"Job {job.name} triggered manually")
+            except asyncio.TimeoutError:
+                pass
+            job._trigger.clear()
+
+            await self._wait_for_dependencies(job)
+            await self._run(job)
+
+    async def _wait_for_dependencies(self, job: Job) -> None:
+        for name in job.depends_on:
+            dependency = self.jobs[name]
+            if not dependency._succeeded.is_set():
+                logger.info(f"Job {job.name} waiting for {name} to succeed first")
+                await dependency._succeeded.wait()
+            # Don't run alongside a dependency, wait for its current run to finish
+            async with dependency._lock:
+                pass
+
+    async def _run(self, job: Job) -> None:
+        async with job._lock:
+            job.running = True
+            job.next_run = None
+            job.last_started = datetime.now(UTC)
+            timer_start = time.perf_counter()
+            status = "cancelled"
+            try:
+                await job.func()
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                status = "failed"
+                job.failures += 1
+                job.last_error = str(e)
+                logger.error(f"Job {job.name} failed ({job.failures} in a row): {e}", exc_info=True)
+
+            else:
+                status = "success"
+                job.failures = 0
+                job.last_error = None
+                job.last_success = datetime.now(UTC)
+                job._succeeded.set()
+                SYNC_JOB_LAST_SUCCESS.labels(job.name).set(job.last_success.timestamp())
+
+            finally:
+                job.running = False
+                job.last_finished = datetime.now(UTC)
+                job.last_duration = time.perf_counter() - timer_start
+                SYNC_JOB_DURATION.labels(job.name, status).observe(job.last_duration)
+                logger.debug(f"Job {job.name} finished in {job.last_duration:.2f}s")
@@ -1,124 +1,559 @@
 import asyncio
 import logging
+import os
+import socket
+import time
+import zoneinfo
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from ..api.jellyseerr import JellyseerrClient
-from ..api.tmdb import TMDBClient
-from ..api.jellyfin import JellyfinClient
+from ..api.clients import ApiClients
+from ..api.jellyfin import JellyfinUser
 from ..services.requests import RequestService
 from ..services.tmdb import TMDBService
-from ..services.jellyfin import JellyfinService
+from ..services.jellyfin import JellyfinService, watch_history_state_key
+from ..services.sync_state import SyncStateService
+from ..services.job_queue import JobQueue
+from ..services.sync_runs import SyncRunService, track_sync_run
+from ..services.webhooks import WatchEventQueue
+from ..database import SyncJob, SyncState
 from ..config import Settings
+from ..metrics import SYNC_QUEUE_JOB_DURATION
+from ..sync_stats import count
+from .leader import LeaderElection
+from .scheduler import Job, Scheduler
 
 logger = logging.getLogger(__name__)
 
+REQUESTS_STATE_KEY = "jellyseerr_requests"
+
+# Job types in the sync_jobs queue
+WATCH_HISTORY_JOB = "watch_history"
+
+def user_run_name(job: str) -> str:
+    """Sync run ledger name for the per-user runs of a job, kept apart from the job's own runs"""
+    return f"{job}_user"
+
+def make_tmdb_service(session: AsyncSession, settings: Settings, clients: ApiClients) -> TMDBService:
+    """Build a TMDBService configured from settings"""
+    return TMDBService(
+        session, clients.tmdb,
+        negative_ttl=timedelta(days=settings.TMDB_NEGATIVE_TTL_DAYS)
+    )
+
 async def sync_jellyseerr_requests(
     session_maker: async_sessionmaker[AsyncSession],
     settings: Settings,
-    interval_seconds: int = 300 # 5 minutes
+    clients: ApiClients
 ) -> None:
     """
-    Periodically sync requests from Jellyseerr
+    Sync requests from Jellyseerr
     """
-    client = JellyseerrClient(
-        base_url=settings.JELLYSEERR_URL,
-        api_key=settings.JELLYSEERR_API_KEY
-    )
+    logger.info("Syncing Jellyseerr requests...")
+
+    async with session_maker() as session:
+        tmdb_service = make_tmdb_service(session, settings, clients)
+        request_service = RequestService(session, tmdb_service, chunk_size=settings.UPSERT_CHUNK_SIZE)
+        sync_state = SyncStateService(session)
 
-    tmdb_client = TMDBClient(
-            api_key=settings.TMDB_API_KEY
+        state = await sync_state.get(REQUESTS_STATE_KEY)
+        now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+        full = sync_state.needs_full_sync(
+            state, now, timedelta(seconds=settings.JELLYSEERR_FULL_SYNC_INTERVAL)
         )
 
-    while True:
-        try:
-            logger.info("Syncing Jellyseerr requests...")
+        reconcile = False
+        if full:
+            # Fetch all requests from Jellyseerr
+            requests, reconcile = await clients.jellyseerr.get_all_requests()
+            if not reconcile:
+                # Requests missing from the listing may still exist, don't mark them deleted
+                logger.warning("Jellyseerr request listing kept changing while paging, skipping deletion sweep")
+        else:
+            # Only requests changed since the last sync
+            requests = await clients.jellyseerr.get_requests_since(state.cursor)
+        logger.info(f"Fetched {len(requests)} requests from Jellyseerr ({'full' if full else 'incremental'})")
+        count(fetched=len(requests))
 
-            async with session_maker() as session:
-                tmdb_service = TMDBService(session, tmdb_client)
-                request_service = RequestService(session, tmdb_service)
-                # Fetch all requests from Jellyseerr
-                requests = await client.get_all_requests()
-                logger.info(f"Fetched {len(requests)} requests from Jellyseerr")
+        # Sync to database, deletions are only detected on a full reconcile
+        await request_service.sync_requests(requests, reconcile=reconcile)
 
-                # Sync to database
-                await request_service.sync_requests(requests)
-                logger.info("Sync complete")
+        # Advance the high-water mark to the newest update we've seen
+        cursor = max(
+            (request.updatedAt for request in requests),
+            default=state.cursor if state else None
+        )
+        # A full sync without its deletion sweep is tried again next run
+        await sync_state.mark_synced(REQUESTS_STATE_KEY, cursor=cursor, full=reconcile)
+        await session.commit()
+        logger.info("Sync complete")
 
-        except Exception as e:
-            logger.error(f"Error syncing requests: {e}")
+async def sync_jellyseerr_request(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients,
+    request_id: int
+) -> None:
+    """
+    Sync a single Jellyseerr request, as announced by a webhook.
+    Errors are logged, the next poll will pick the request up.
+    """
+    try:
+        request = await clients.jellyseerr.get_request(request_id)
 
-        await asyncio.sleep(interval_seconds)
+        async with session_maker() as session:
+            tmdb_service = make_tmdb_service(session, settings, clients)
+            request_service = RequestService(session, tmdb_service)
+            await request_service.sync_request(request_id, request)
+
+        logger.info(f"Synced Jellyseerr request {request_id} from webhook{' (deleted)' if request is None else ''}")
+
+    except Exception as e:
+        logger.error(f"Error syncing Jellyseerr request {request_id}: {e}")
 
 async def sync_jellyfin_users(
     session_maker: async_sessionmaker[AsyncSession],
     settings: Settings,
-    interval_seconds: int = 300 # 5 minutes
+    clients: ApiClients
 ) -> None:
     """
-    Periodically sync users from Jellyfin
+    Sync users from Jellyfin
     """
-    logger.info("Starting Jellyfin users sync task")
-    client = JellyfinClient(
-        base_url=settings.JELLYFIN_URL,
-        api_key=settings.JELLYFIN_API_KEY
-    )
+    logger.info("Syncing Jellyfin users...")
 
-    tmdb_client = TMDBClient(api_key=settings.TMDB_API_KEY)
+    async with session_maker() as session:
+        tmdb_service = make_tmdb_service(session, settings, clients)
+        jellyfin_service = JellyfinService(session, clients.jellyfin, tmdb_service)
+        # Fetch all users from Jellyfin
+        await jellyfin_service.sync_users()
+
+async def sync_library_catalog(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients
+) -> None:
+    """
+    Sync the shared Jellyfin library catalog,
+    so per-user syncs only need to fetch play state
+    """
+    logger.info("Syncing Jellyfin library catalog...")
+
+    async with session_maker() as session:
+        tmdb_service = make_tmdb_service(session, settings, clients)
+        jellyfin_service = JellyfinService(
+            session, clients.jellyfin, tmdb_service,
+            full_sync_interval=timedelta(seconds=settings.CATALOG_FULL_SYNC_INTERVAL),
+            chunk_size=settings.UPSERT_CHUNK_SIZE
+        )
+        await jellyfin_service.sync_catalog()
+
+async def sync_jellyfin_watch_history(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients
+) -> None:
+    """
+    Sync watch history from Jellyfin for every active user
+    """
+    logger.info("Syncing Jellyfin watch history...")
+
+    # First get all users
+    users = await clients.jellyfin.get_users()
+
+    # Skip users with no activity since their last sync
+    async with session_maker() as session:
+        states = await SyncStateService(session).get_many(
+            [watch_history_state_key(user.jellyfin_id) for user in users]
+        )
+    now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+    full_sync_interval = timedelta(seconds=settings.WATCH_HISTORY_FULL_SYNC_INTERVAL)
+    active_users = [
+        user for user in users
+        if not is_idle(user, states.get(watch_history_state_key(user.jellyfin_id)), now, full_sync_interval)
+    ]
+    if len(active_users) < len(users):
+        logger.info(f"Skipping {len(users) - len(active_users)} idle users")
+        # Idle users are up to date, record that so their sync lag doesn't grow
+        active_ids = {user.jellyfin_id for user in active_users}
+        async with session_maker() as session:
+            await SyncStateService(session).mark_checked([
+                watch_history_state_key(user.jellyfin_id) for user in users if user.jellyfin_id not in active_ids
+            ])
+            await session.commit()
+
+    if settings.SYNC_QUEUE_ENABLED:
+        # Hand the users to the job queue, any worker process can pick them up
+        async with session_maker() as session:
+            queued = await JobQueue(session).enqueue(
+                WATCH_HISTORY_JOB, [user.jellyfin_id for user in active_users],
+                max_attempts=settings.SYNC_QUEUE_MAX_ATTEMPTS
+            )
+        logger.info(f"Queued watch history sync for {queued} users")
+        return
+
+    # Then sync watch history for several users at a time
+    semaphore = asyncio.Semaphore(settings.WATCH_HISTORY_CONCURRENCY)
+    await asyncio.gather(*(
+        sync_user_watch_history(
+            session_maker=session_maker,
+            settings=settings,
+            clients=clients,
+            user=user,
+            semaphore=semaphore
+        )
+        for user in active_users
+    ))
+
+    logger.info("Watch history sync complete")
+
+async def consume_sync_jobs(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients,
+    worker_id: str
+) -> None:
+    """
+    Claim and run queued sync jobs, several at a time.
+    Runs in every worker process, not just the leader.
+    """
+    logger.info(f"Starting sync job consumer {worker_id}")
+    visibility_timeout = timedelta(seconds=settings.SYNC_QUEUE_VISIBILITY_TIMEOUT)
 
     while True:
         try:
-            logger.info("Syncing Jellyfin users...")
-
             async with session_maker() as session:
-                tmdb_service = TMDBService(session, tmdb_client)
-                jellyfin_service = JellyfinService(session, client, tmdb_service)
-                # Fetch all users from Jellyfin
-                await jellyfin_service.sync_users()
+                jobs = await JobQueue(session).claim(
+                    worker_id, list(SYNC_JOB_HANDLERS),
+                    limit=settings.WATCH_HISTORY_CONCURRENCY,
+                    visibility_timeout=visibility_timeout
+                )
 
-        except Exception as e:
-            logger.error(f"Error syncing users: {e}")
+            if not jobs:
+                await asyncio.sleep(settings.SYNC_QUEUE_POLL_INTERVAL)
+                continue
 
-        await asyncio.sleep(interval_seconds)
+            await asyncio.gather(*(
+                run_sync_job(session_maker, settings, clients, job, worker_id) for job in jobs
+            ))
 
-async def sync_jellyfin_watch_history(
+        except Exception as e:
+            logger.error(f"Error consuming sync jobs: {e}")
+            await asyncio.sleep(settings.SYNC_QUEUE_POLL_INTERVAL)
+
+async def run_sync_job(
     session_maker: async_sessionmaker[AsyncSession],
     settings: Settings,
-    interval_seconds: int = 300 # 5 minutes
+    clients: ApiClients,
+    job: SyncJob,
+    worker_id: str
 ) -> None:
     """
-    Periodically sync watch history from Jellyfin
+    Run one claimed job and record the outcome in the queue.
+    A heartbeat keeps the job claimed for as long as it runs.
     """
-    logger.info("Starting Jellyfin watch history sync task")
-    client = JellyfinClient(
-        base_url=settings.JELLYFIN_URL,
-        api_key=settings.JELLYFIN_API_KEY
+    heartbeat = asyncio.create_task(
+        extend_sync_job(session_maker, job, worker_id, timedelta(seconds=settings.SYNC_QUEUE_VISIBILITY_TIMEOUT))
     )
+    started = time.perf_counter()
+    try:
+        async with track_sync_run(session_maker, user_run_name(job.job_type), job.user_id):
+            await SYNC_JOB_HANDLERS[job.job_type](session_maker, settings, clients, job.user_id)
+
+    except Exception as e:
+        SYNC_QUEUE_JOB_DURATION.labels(job.job_type, "failed").observe(time.perf_counter() - started)
+        logger.error(f"Sync job {job.job_type} for user {job.user_id} failed: {e}", exc_info=True)
+        await stop_heartbeat(heartbeat)
+        async with session_maker() as session:
+            recorded = await JobQueue(session).fail(
+                job, worker_id, str(e),
+                retry_base=settings.SCHEDULER_RETRY_BASE,
+                max_backoff=settings.SCHEDULER_MAX_BACKOFF
+            )
+
+    else:
+        SYNC_QUEUE_JOB_DURATION.labels(job.job_type, "success").observe(time.perf_counter() - started)
+        await stop_heartbeat(heartbeat)
+        async with session_maker() as session:
+            recorded = await JobQueue(session).complete(job, worker_id)
 
-    tmdb_client = TMDBClient(api_key=settings.TMDB_API_KEY)
+    finally:
+        # Already stopped unless the job was cancelled
+        await stop_heartbeat(heartbeat)
 
+    if not recorded:
+        logger.warning(f"Sync job {job.job_type} for user {job.user_id} was taken over by another worker, leaving it to them")
+
+async def extend_sync_job(
+    session_maker: async_sessionmaker[AsyncSession],
+    job: SyncJob,
+    worker_id: str,
+    visibility_timeout: timedelta
+) -> None:
+    """Keep extending a running job's visibility timeout until cancelled or the job is lost"""
     while True:
+        await asyncio.sleep(visibility_timeout.total_seconds() / 3)
         try:
-            logger.info("Syncing Jellyfin watch history...")
-
             async with session_maker() as session:
-                # First get all users
-                tmdb_service = TMDBService(session, tmdb_client)
-                jellyfin_service = JellyfinService(session, client, tmdb_service)
-                users = await client.get_users()
-
-                # Then sync watch history for each user
-                for user in users:
-                    try:
-                        logger.info(f"Processing user: {user.username} ({user.jellyfin_id})")
-                        await jellyfin_service.sync_user_watch_history(user.jellyfin_id)
-                    except Exception as e:
-                        logger.error(f"Error processing user {user.username}: {e}", exc_info=True)
-                        continue
-
-                logger.info("Watch history sync complete")
+                if not await JobQueue(session).extend(job, worker_id, visibility_timeout):
+                    logger.warning(f"Lost the claim on sync job {job.job_type} for user {job.user_id}")
+                    return
+        except Exception as e:
+            # Try again next beat, the timeout leaves room for a few misses
+            logger.warning(f"Failed to extend sync job {job.job_type} for user {job.user_id}: {e}")
+
+async def stop_heartbeat(heartbeat: asyncio.Task[None]) -> None:
+    heartbeat.cancel()
+    await asyncio.gather(heartbeat, return_exceptions=True)
+
+async def sync_watch_history_job(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients,
+    user_id: str
+) -> None:
+    """Sync one user's watch history for the job queue, raising on failure so it's retried"""
+    async with session_maker() as session:
+        tmdb_service = make_tmdb_service(session, settings, clients)
+        jellyfin_service = JellyfinService(
+            session, clients.jellyfin, tmdb_service,
+            full_sync_interval=timedelta(seconds=settings.WATCH_HISTORY_FULL_SYNC_INTERVAL),
+            chunk_size=settings.UPSERT_CHUNK_SIZE
+        )
+        await jellyfin_service.sync_user_watch_history(user_id)
+
+SYNC_JOB_HANDLERS: Dict[str, Callable[[async_sessionmaker[AsyncSession], Settings, ApiClients, str], Awaitable[None]]] = {
+    WATCH_HISTORY_JOB: sync_watch_history_job,
+}
+
+def is_idle(user: JellyfinUser, state: SyncState | None, now: datetime, full_sync_interval: timedelta) -> bool:
+    """
+    Whether a user has had no activity since their last watch history sync.
+    Users due a full reconcile are never idle, so the periodic sweep still covers everyone.
+    """
+    if SyncStateService.needs_full_sync(state, now, full_sync_interval):
+        return False
+
+    last_seen = user.last_seen
+    if last_seen.tzinfo is None:
+        # Jellyfin reports UTC, our fallback is a naive utcnow()
+        last_seen = last_seen.replace(tzinfo=zoneinfo.ZoneInfo("UTC"))
+
+    # The cursor is when the last sync started, so anything after it is new
+    return last_seen < state.cursor
+
+async def sync_user_watch_history(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients,
+    user: JellyfinUser,
+    semaphore: asyncio.Semaphore
+) -> None:
+    """
+    Sync watch history for one user in its own session.
+    Errors are logged and not raised, so one user can't fail the others.
+    """
+    async with semaphore:
+        try:
+            logger.info(f"Processing user: {user.username} ({user.jellyfin_id})")
+
+            async with track_sync_run(session_maker, user_run_name(WATCH_HISTORY_JOB), user.jellyfin_id), session_maker() as session:
+                tmdb_service = make_tmdb_service(session, settings, clients)
+                jellyfin_service = JellyfinService(
+                    session, clients.jellyfin, tmdb_service,
+                    full_sync_interval=timedelta(seconds=settings.WATCH_HISTORY_FULL_SYNC_INTERVAL),
+                    chunk_size=settings.UPSERT_CHUNK_SIZE
+                )
+                await jellyfin_service.sync_user_watch_history(user.jellyfin_id)
 
         except Exception as e:
-            logger.error(f"Error syncing watch history: {e}")
+            logger.error(f"Error processing user {user.username}: {e}", exc_info=True)
+
+async def ingest_watch_events(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients,
+    queue: WatchEventQueue
+) -> None:
+    """
+    Write queued webhook events to watch history in micro-batches.
+    Each batch fetches the current play state of the touched items,
+    so it doesn't matter which events arrived or in what order.
+    """
+    logger.info("Starting webhook ingest task")
+
+    while True:
+        batch = await queue.next_batch(
+            max_items=settings.WEBHOOK_BATCH_SIZE,
+            window=settings.WEBHOOK_BATCH_WINDOW
+        )
+
+        for user_id, item_ids in batch.items():
+            try:
+                async with session_maker() as session:
+                    tmdb_service = make_tmdb_service(session, settings, clients)
+                    jellyfin_service = JellyfinService(
+                        session, clients.jellyfin, tmdb_service,
+                        chunk_size=settings.UPSERT_CHUNK_SIZE
+                    )
+                    items = await clients.jellyfin.get_watch_items(user_id, sorted(item_ids))
+                    written = await jellyfin_service.sync_watch_items(user_id, items)
+                    logger.debug(f"Ingested {written} watch history rows from webhooks for user {user_id}")
+
+            except Exception as e:
+                # Polling will pick these up, so log and keep going
+                logger.error(f"Error ingesting webhook events for user {user_id}: {e}")
+
+async def refresh_stale_tmdb_media(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients
+) -> None:
+    """
+    Refresh outdated TMDB rows in the background,
+    so syncs never wait on TMDB for data we already have
+    """
+    async with session_maker() as session:
+        tmdb_service = make_tmdb_service(session, settings, clients)
+        refreshed = await tmdb_service.refresh_stale(
+            stale_after=timedelta(days=settings.TMDB_STALE_AFTER_DAYS),
+            limit=settings.TMDB_REFRESH_BATCH_SIZE
+        )
+        await session.commit()
+
+        if refreshed:
+            logger.info(f"Refreshed {refreshed} outdated TMDB entries")
+
+async def prune_sync_runs(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients
+) -> None:
+    """
+    Delete sync runs older than the retention window from the ledger
+    """
+    async with session_maker() as session:
+        pruned = await SyncRunService(session).prune(timedelta(days=settings.SYNC_RUN_RETENTION_DAYS))
+
+    if pruned:
+        logger.info(f"Pruned {pruned} old sync runs")
+
+async def run_tracked(
+    name: str,
+    func: Callable[..., Awaitable[None]],
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients
+) -> None:
+    """Run a scheduled job as a run in the sync ledger"""
+    async with track_sync_run(session_maker, name):
+        await func(session_maker=session_maker, settings=settings, clients=clients)
+
+def build_scheduler(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients
+) -> Scheduler:
+    """
+    Schedule the periodic sync jobs from settings.
+    Watch history depends on users, since its rows reference them.
+    Sync jobs are recorded in the sync run ledger.
+    """
+    scheduler = Scheduler()
+
+    def add_job(name: str, func: Callable[..., Awaitable[None]], interval: float, cron: str | None,
+        depends_on: Tuple[str, ...] = (), tracked: bool = True) -> None:
+        if tracked:
+            func = partial(run_tracked, name, func)
+        scheduler.add_job(Job(
+            name=name,
+            func=partial(func, session_maker=session_maker, settings=settings, clients=clients),
+            interval=interval,
+            cron=cron,
+            jitter=settings.SCHEDULER_JITTER,
+            retry_base=settings.SCHEDULER_RETRY_BASE,
+            max_backoff=settings.SCHEDULER_MAX_BACKOFF,
+            depends_on=depends_on
+        ))
+
+    add_job("jellyseerr_requests", sync_jellyseerr_requests,
+        settings.JELLYSEERR_SYNC_INTERVAL, settings.JELLYSEERR_SYNC_CRON)
+    add_job("jellyfin_users", sync_jellyfin_users,
+        settings.USERS_SYNC_INTERVAL, settings.USERS_SYNC_CRON)
+    add_job("library_catalog", sync_library_catalog,
+        settings.CATALOG_SYNC_INTERVAL, settings.CATALOG_SYNC_CRON)
+    add_job("watch_history", sync_jellyfin_watch_history,
+        settings.WATCH_HISTORY_SYNC_INTERVAL, settings.WATCH_HISTORY_SYNC_CRON,
+        depends_on=("jellyfin_users",))
+    add_job("tmdb_refresh", refresh_stale_tmdb_media,
+        settings.TMDB_REFRESH_INTERVAL, settings.TMDB_REFRESH_CRON)
+    add_job("prune_sync_runs", prune_sync_runs, 86400, None, tracked=False)
+
+    return scheduler
+
+def start_sync_jobs(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients
+) -> Tuple[Scheduler, asyncio.Task[None] | None]:
+    """
+    Start the scheduled sync jobs, behind leader election if enabled.
+    Returns the scheduler and the leader election task, if any.
+    """
+    scheduler = build_scheduler(session_maker=session_maker, settings=settings, clients=clients)
+
+    if not settings.SYNC_LEADER_ELECTION:
+        scheduler.start()
+        return scheduler, None
+
+    # Every process campaigns, only the leader runs the jobs
+    leader = LeaderElection(
+        engine=session_maker.kw["bind"],
+        lock_id=settings.SYNC_LEADER_LOCK_ID,
+        check_interval=settings.SYNC_LEADER_CHECK_INTERVAL
+    )
+    leader_task = asyncio.create_task(
+        leader.run(on_elected=scheduler.start, on_demoted=scheduler.stop)
+    )
+    return scheduler, leader_task
+
+async def stop_sync_jobs(scheduler: Scheduler, leader_task: asyncio.Task[None] | None) -> None:
+    """Stop the scheduled sync jobs and hand leadership to another process"""
+    if leader_task:
+        logger.info("Giving up sync leadership...")
+        leader_task.cancel()
+        try:
+            await leader_task
+        except asyncio.CancelledError:
+            logger.info("Leader election task cancelled successfully")
+
+    if scheduler.running:
+        logger.info("Stopping sync scheduler...")
+        await scheduler.stop()
+
+def start_job_consumers(
+    session_maker: async_sessionmaker[AsyncSession],
+    settings: Settings,
+    clients: ApiClients
+) -> List[asyncio.Task[None]]:
+    """Start this process' sync job queue consumers, if the queue is enabled"""
+    if not settings.SYNC_QUEUE_ENABLED:
+        return []
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    return [
+        asyncio.create_task(consume_sync_jobs(
+            session_maker=session_maker,
+            settings=settings,
+            clients=clients,
+            worker_id=f"{worker_id}:{index}"
+        ))
+        for index in range(settings.SYNC_QUEUE_CONSUMERS)
+    ]
 
-        logger.debug(f"Sleeping for {interval_seconds} seconds")
-        await asyncio.sleep(interval_seconds)
+async def stop_job_consumers(consumers: List[asyncio.Task[None]]) -> None:
+    """Cancel queue consumers. Jobs they were running are picked up again after their visibility timeout"""
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
@@ -0,0 +1,77 @@
+"""
+Standalone sync worker, runs the scheduled sync jobs without the web app.
+
+    python -m jellynalyst.worker
+
+Run the web app with SYNC_JOBS_ENABLED=false next to it. Leader election
+still applies, so several workers can run for failover. With
+SYNC_QUEUE_ENABLED, every worker also takes per-user syncs from the queue,
+so adding workers adds sync capacity.
+"""
+from prometheus_client import REGISTRY, start_http_server
+import asyncio
+import logging
+import signal
+
+from .config import Settings
+from .api.clients import ApiClients
+from .database import init_db, init_session_maker
+from .metrics import CacheCollector, instrument_engine, monitor_event_loop_lag
+from .services.tmdb import get_media_cache, init_media_cache
+from .tasks.sync import start_job_consumers, start_sync_jobs, stop_job_consumers, stop_sync_jobs
+
+logger = logging.getLogger("jellynalyst.worker")
+
+async def run_worker(settings: Settings) -> None:
+    """Run the sync jobs until SIGINT or SIGTERM"""
+    logger.info("Initializing database...")
+    session_maker = await init_db(settings)
+    init_session_maker(session_maker)
+    instrument_engine(session_maker.kw["bind"])
+
+    init_media_cache(max_size=settings.TMDB_CACHE_SIZE, ttl=settings.TMDB_CACHE_TTL)
+    clients = ApiClients(settings)
+
+    REGISTRY.register(CacheCollector("tmdb", get_media_cache))
+    loop_lag_task = asyncio.create_task(monitor_event_loop_lag(settings.EVENT_LOOP_LAG_INTERVAL))
+    if settings.WORKER_METRICS_PORT:
+        # Sync lag per user is computed by the web app's /metrics, from the shared database
+        start_http_server(settings.WORKER_METRICS_PORT)
+        logger.info(f"Serving metrics on port {settings.WORKER_METRICS_PORT}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    scheduler, leader_task = start_sync_jobs(
+        session_maker=session_maker,
+        settings=settings,
+        clients=clients
+    )
+    # With the job queue enabled, every worker helps with per-user syncs, leader or not
+    job_consumers = start_job_consumers(
+        session_maker=session_maker,
+        settings=settings,
+        clients=clients
+    )
+    logger.info("Sync worker started")
+
+    try:
+        await stop.wait()
+        logger.info("Shutting down sync worker...")
+    finally:
+        await stop_sync_jobs(scheduler, leader_task)
+        await stop_job_consumers(job_consumers)
+        loop_lag_task.cancel()
+        await clients.aclose()
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    asyncio.run(run_worker(Settings(_env_file='.env')))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Compare watch history write throughput: one upsert per row (the old path)
+against the batched upsert JellyfinService uses now.
+
+Both paths write the same synthetic rows for a throwaway user, first as
+inserts into an empty table and then as updates of existing rows. Everything
+the benchmark writes is deleted afterwards.
+
+    PYTHONPATH=. python scripts/benchmark_watch_history.py --rows 5000
+
+Needs the database settings from .env and a migrated schema.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Any, Awaitable, Callable, Dict, List
+import argparse
+import asyncio
+import time
+import zoneinfo
+
+from jellynalyst.config import Settings
+from jellynalyst.database import JellyfinUsers, JellyfinWatchHistory, init_db
+from jellynalyst.services.jellyfin import WATCH_HISTORY_UPSERT
+
+BENCHMARK_USER = "benchmark-watch-history"
+
+UPDATE_COLUMNS = (
+    "item_name", "item_type", "tmdb_id", "imdb_id", "genres",
+    "played_percentage", "play_count", "last_played_date",
+    "is_played", "runtime_ticks", "production_year",
+)
+
+def make_rows(count: int, play_count: int) -> List[Dict[str, Any]]:
+    """Synthetic watch history rows, shaped like JellyfinService._watch_history_row"""
+    now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+    return [
+        {
+            "user_id": BENCHMARK_USER,
+            "item_id": f"benchmark-{index:08d}",
+            "item_name": f"Benchmark item {index}",
+            "item_type": "Episode" if index % 3 else "Movie",
+            "tmdb_id": None,
+            "imdb_id": None,
+            "genres": ["Drama", "Comedy"],
+            "played_percentage": 100.0,
+            "play_count": play_count,
+            "last_played_date": now - timedelta(minutes=index),
+            "is_played": True,
+            "runtime_ticks": 36000000000,
+            "production_year": 2000 + index % 25,
+        }
+        for index in range(count)
+    ]
+
+async def write_per_row(session: AsyncSession, rows: List[Dict[str, Any]], chunk_size: int) -> None:
+    """The old path: one INSERT ... ON CONFLICT per row"""
+    for row in rows:
+        stmt = insert(JellyfinWatchHistory).values(**row)
+        stmt = stmt.on_conflict_do_update(
+            constraint='uq_user_item',
+            set_={column: row[column] for column in UPDATE_COLUMNS}
+        )
+        await session.execute(stmt)
+
+async def write_batched(session: AsyncSession, rows: List[Dict[str, Any]], chunk_size: int) -> None:
+    """The new path: the module-level upsert executed chunk_size rows at a time"""
+    for offset in range(0, len(rows), chunk_size):
+        await session.execute(WATCH_HISTORY_UPSERT, rows[offset:offset + chunk_size])
+
+async def measure(
+    session_maker: async_sessionmaker[AsyncSession],
+    write: Callable[[AsyncSession, List[Dict[str, Any]], int], Awaitable[None]],
+    rows: List[Dict[str, Any]],
+    chunk_size: int
+) -> float:
+    """Write rows in one transaction and return rows per second"""
+    async with session_maker() as session:
+        started = time.perf_counter()
+        await write(session, rows, chunk_size)
+        await session.commit()
+        return len(rows) / (time.perf_counter() - started)
+
+async def clear_rows(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    async with session_maker() as session:
+        await session.execute(delete(JellyfinWatchHistory).where(JellyfinWatchHistory.user_id == BENCHMARK_USER))
+        await session.commit()
+
+async def run(rows: int, chunk_size: int) -> None:
+    settings = Settings(_env_file='.env')
+    session_maker = await init_db(settings)
+
+    now = datetime.now(zoneinfo.ZoneInfo("UTC"))
+    async with session_maker() as session:
+        await session.execute(
+            insert(JellyfinUsers)
+            .values(jellyfin_id=BENCHMARK_USER, username=BENCHMARK_USER,
+                is_administrator=False, last_login=now, last_seen=now)
+            .on_conflict_do_nothing(index_elements=["jellyfin_id"])
+        )
+        await session.commit()
+
+    inserts = make_rows(rows, play_count=1)
+    updates = make_rows(rows, play_count=2)
+
+    print(f"Writing {rows} rows, batched path uses chunks of {chunk_size}")
+    try:
+        for name, write in (("per-row", write_per_row), ("batched", write_batched)):
+            await clear_rows(session_maker)
+            insert_rate = await measure(session_maker, write, inserts, chunk_size)
+            update_rate = await measure(session_maker, write, updates, chunk_size)
+            print(f"{name:>8}: {insert_rate:8.0f} rows/s inserting, {update_rate:8.0f} rows/s updating")
+
+    finally:
+        await clear_rows(session_maker)
+        async with session_maker() as session:
+            await session.execute(delete(JellyfinUsers).where(JellyfinUsers.jellyfin_id == BENCHMARK_USER))
+            await session.commit()
+        await session_maker.kw["bind"].dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-row and batched watch history upserts")
+    parser.add_argument("--rows", type=int, default=5000, help="rows written per run")
+    parser.add_argument("--chunk-size", type=int, default=Settings(_env_file='.env').UPSERT_CHUNK_SIZE,
+        help="rows per statement on the batched path")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.chunk_size))
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,12 @@ while ! nc -z db 5432; do
 done
 echo "Database is ready!"
 
+# The worker only runs the sync jobs, migrations are left to the migrate or web container
+if [ "${1:-web}" = "worker" ]; then
+    echo "Starting sync worker..."
+    exec python -m jellynalyst.worker
+fi
+
 echo "Checking database state..."
 if ! alembic current 2>/dev/null; then
     echo "No alembic history found - initializing fresh database..."
@@ -32,6 +38,12 @@ else
     alembic upgrade head
 fi
 
+# One-shot migration run, for other containers to wait on
+if [ "${1:-web}" = "migrate" ]; then
+    echo "Migrations complete"
+    exit 0
+fi
+
 # Start the application
 echo "Starting application on port ${APP_PORT}..."
 uvicorn jellynalyst.main:app --host 0.0.0.0 --port "${APP_PORT}"
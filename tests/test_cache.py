@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+from jellynalyst.services.cache import TTLCache
+
+async def test_concurrent_batches_share_loads():
+    cache: TTLCache[int, str] = TTLCache(max_size=10, ttl=60)
+    calls = []
+
+    async def loader(keys):
+        calls.append(sorted(keys))
+        await asyncio.sleep(0.01)
+        return {key: f"value {key}" for key in keys}
+
+    first, second = await asyncio.gather(
+        cache.get_or_load_many([1, 2], loader),
+        cache.get_or_load_many([2, 3], loader),
+    )
+
+    assert first == {1: "value 1", 2: "value 2"}
+    assert second == {2: "value 2", 3: "value 3"}
+    # Key 2 was only loaded by the first batch
+    assert calls == [[1, 2], [3]]
+    assert cache.coalesced == 1
+
+async def test_batch_and_single_loads_share_in_flight_keys():
+    cache: TTLCache[int, str] = TTLCache(max_size=10, ttl=60)
+    single_calls = 0
+
+    async def batch_loader(keys):
+        await asyncio.sleep(0.01)
+        return {key: "batch" for key in keys}
+
+    async def single_loader():
+        nonlocal single_calls
+        single_calls += 1
+        return "single"
+
+    batch = asyncio.create_task(cache.get_or_load_many([1], batch_loader))
+    await asyncio.sleep(0)
+    assert await cache.get_or_load(1, single_loader) == "batch"
+    assert await batch == {1: "batch"}
+    assert single_calls == 0
+
+async def test_keys_the_loader_leaves_out_are_missing_for_waiters_too():
+    cache: TTLCache[int, str] = TTLCache(max_size=10, ttl=60)
+
+    async def loader(keys):
+        await asyncio.sleep(0.01)
+        return {}
+
+    first, second = await asyncio.gather(
+        cache.get_or_load_many([1], loader),
+        cache.get_or_load_many([1], loader),
+    )
+    assert first == second == {}
+    assert cache.get(1) is None
+
+async def test_waiters_retry_a_failed_load_themselves():
+    cache: TTLCache[int, str] = TTLCache(max_size=10, ttl=60)
+
+    async def failing(keys):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def working(keys):
+        return {key: "ok" for key in keys}
+
+    failed, recovered = await asyncio.gather(
+        cache.get_or_load_many([1], failing),
+        cache.get_or_load_many([1], working),
+        return_exceptions=True,
+    )
+    assert isinstance(failed, RuntimeError)
+    assert recovered == {1: "ok"}
+
+async def test_waiters_survive_the_loader_being_cancelled():
+    cache: TTLCache[int, str] = TTLCache(max_size=10, ttl=60)
+
+    async def slow(keys):
+        await asyncio.sleep(10)
+        return {}
+
+    async def fast(keys):
+        return {key: "ok" for key in keys}
+
+    owner = asyncio.create_task(cache.get_or_load_many([1], slow))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load_many([1], fast))
+    await asyncio.sleep(0)
+    owner.cancel()
+
+    assert await waiter == {1: "ok"}
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+async def test_entries_expire_after_ttl():
+    cache: TTLCache[int, str] = TTLCache(max_size=10, ttl=0.01)
+    cache.set(1, "one")
+    assert cache.get(1) == "one"
+
+    await asyncio.sleep(0.02)
+    assert cache.get(1) is None
+    assert cache.stats()["size"] == 0
+
+def test_least_recently_used_entry_is_evicted():
+    cache: TTLCache[int, str] = TTLCache(max_size=2, ttl=60)
+    cache.set(1, "one")
+    cache.set(2, "two")
+    # Reading 1 makes 2 the least recently used
+    assert cache.get(1) == "one"
+    cache.set(3, "three")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "one"
+    assert cache.get(3) == "three"
+
+def test_invalidate_drops_the_entry():
+    cache: TTLCache[int, str] = TTLCache(max_size=10, ttl=60)
+    cache.set(1, "one")
+    cache.invalidate(1)
+    cache.invalidate(2)
+    assert cache.get(1) is None
+
+async def test_concurrent_single_loads_share_one_call():
+    cache: TTLCache[int, str] = TTLCache(max_size=10, ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(cache.get_or_load(1, loader) for _ in range(5)))
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert await cache.get_or_load(1, loader) == "value"
+    assert calls == 1
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 1, 4)
+    assert stats["hit_ratio"] == pytest.approx(5 / 6)
+
+def test_stats_of_an_unused_cache():
+    stats = TTLCache(max_size=10, ttl=60).stats()
+    assert stats["hit_ratio"] == 0.0
+    assert stats["size"] == 0
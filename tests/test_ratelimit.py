@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import asyncio
+import time
+import zoneinfo
+
+import pytest
+
+from jellynalyst.api.ratelimit import AdaptiveLimiter, TokenBucket, backoff_delay, parse_retry_after
+
+UTC = zoneinfo.ZoneInfo("UTC")
+
+@pytest.mark.parametrize("value, expected", [
+    ("120", 120.0),
+    ("1.5", 1.5),
+    ("-5", 0.0),
+    (None, None),
+    ("", None),
+    ("inf", None),
+    ("nan", None),
+    ("soon", None),
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(UTC) + timedelta(seconds=30)
+    delay = parse_retry_after(format_datetime(retry_at.astimezone(timezone.utc), usegmt=True))
+    assert delay is not None and 28 <= delay <= 30
+
+def test_parse_retry_after_naive_date_is_utc():
+    # A -0000 zone parses as a naive datetime
+    retry_at = datetime.now(UTC) + timedelta(seconds=30)
+    delay = parse_retry_after(retry_at.strftime("%a, %d %b %Y %H:%M:%S -0000"))
+    assert delay is not None and 28 <= delay <= 30
+
+def test_parse_retry_after_past_date():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+def test_backoff_delay_is_capped():
+    for _ in range(100):
+        assert 0 <= backoff_delay(2, base=1.0) <= 4.0
+        assert 0 <= backoff_delay(50, base=1.0, cap=10.0) <= 10.0
+
+async def test_token_bucket_allows_burst_then_limits():
+    bucket = TokenBucket(rate=50, capacity=3)
+    started = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+    assert time.monotonic() - started < 0.02
+
+    # Two more tokens at 50/s take about 40ms
+    for _ in range(2):
+        await bucket.acquire()
+    assert time.monotonic() - started >= 0.035
+
+async def test_token_bucket_pause_holds_back_acquire():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(0.05)
+    started = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - started >= 0.045
+
+def test_adaptive_limiter_grows_and_halves():
+    limiter = AdaptiveLimiter(initial=4, maximum=5, minimum=1)
+
+    # A full window of successes raises the limit by one
+    for _ in range(3):
+        limiter.on_success()
+    assert limiter.limit == 4
+    limiter.on_success()
+    assert limiter.limit == 5
+
+    # Never past the maximum
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.limit == 5
+
+    limiter.on_throttle()
+    assert limiter.limit == 2
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.limit == 1
+
+async def test_adaptive_limiter_caps_concurrency():
+    limiter = AdaptiveLimiter(initial=2, maximum=2)
+    in_flight = 0
+    peak = 0
+
+    async def request():
+        nonlocal in_flight, peak
+        async with limiter:
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(request() for _ in range(6)))
+    assert peak == 2
@@ -0,0 +1,143 @@
+from datetime import datetime
+import asyncio
+import zoneinfo
+
+import pytest
+
+from jellynalyst.tasks.scheduler import CronSchedule, Job, Scheduler
+
+UTC = zoneinfo.ZoneInfo("UTC")
+
+async def noop():
+    pass
+
+@pytest.mark.parametrize("expression, after, expected", [
+    ("*/15 * * * *", datetime(2026, 10, 17, 12, 7, tzinfo=UTC), datetime(2026, 10, 17, 12, 15, tzinfo=UTC)),
+    ("30 3 * * *", datetime(2026, 10, 17, 3, 30, tzinfo=UTC), datetime(2026, 10, 18, 3, 30, tzinfo=UTC)),
+    ("0 0 1 1 *", datetime(2026, 10, 17, tzinfo=UTC), datetime(2027, 1, 1, tzinfo=UTC)),
+    ("0 9-17/4 * * 1-5", datetime(2026, 10, 17, 10, 0, tzinfo=UTC), datetime(2026, 10, 19, 9, 0, tzinfo=UTC)),
+    # Only the weekday is restricted, so it alone decides: the next Friday
+    ("0 0 * * 5", datetime(2026, 10, 10, tzinfo=UTC), datetime(2026, 10, 16, tzinfo=UTC)),
+    # Only the day of month is restricted
+    ("0 0 13 * *", datetime(2026, 10, 14, tzinfo=UTC), datetime(2026, 11, 13, tzinfo=UTC)),
+])
+def test_cron_next_after(expression, after, expected):
+    assert CronSchedule(expression).next_after(after) == expected
+
+def test_cron_day_fields_match_either():
+    # Both day fields restricted: the 13th or any Friday, like cron
+    schedule = CronSchedule("0 0 13 * 5")
+    assert schedule.next_after(datetime(2026, 10, 10, tzinfo=UTC)) == datetime(2026, 10, 13, tzinfo=UTC)
+    assert schedule.next_after(datetime(2026, 10, 13, tzinfo=UTC)) == datetime(2026, 10, 16, tzinfo=UTC)
+
+def test_cron_next_after_converts_to_utc():
+    # 10:00 in Toronto is 14:00 UTC, past today's run
+    moment = datetime(2026, 10, 17, 10, 0, tzinfo=zoneinfo.ZoneInfo("America/Toronto"))
+    assert CronSchedule("0 13 * * *").next_after(moment) == datetime(2026, 10, 18, 13, 0, tzinfo=UTC)
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * * 7",
+    "5-1 * * * *",
+    "a * * * *",
+])
+def test_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+def test_cron_never_matching_expression():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(datetime(2026, 10, 17, tzinfo=UTC))
+
+def test_job_needs_a_schedule():
+    with pytest.raises(ValueError):
+        Job("nothing", noop)
+
+def test_job_next_delay():
+    now = datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+    job = Job("interval", noop, interval=300)
+    assert job.next_delay(now, first=True) == 0.0
+    assert job.next_delay(now) == 300
+
+    cron_job = Job("cron", noop, cron="30 12 * * *")
+    assert cron_job.next_delay(now, first=True) == 1800
+
+def test_job_failures_back_off_up_to_the_cap():
+    now = datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+    job = Job("failing", noop, interval=300, retry_base=30, max_backoff=200)
+    delays = []
+    for failures in range(1, 6):
+        job.failures = failures
+        delays.append(job.next_delay(now))
+    assert delays == [30, 60, 120, 200, 200]
+
+def test_job_jitter_is_added_on_top():
+    now = datetime(2026, 10, 17, 12, 0, tzinfo=UTC)
+    job = Job("jittered", noop, interval=300, jitter=10)
+    for _ in range(50):
+        assert 300 <= job.next_delay(now) <= 310
+
+def test_scheduler_rejects_duplicates_and_unknown_dependencies():
+    scheduler = Scheduler()
+    scheduler.add_job(Job("users", noop, interval=60))
+    with pytest.raises(ValueError):
+        scheduler.add_job(Job("users", noop, interval=60))
+
+    scheduler.add_job(Job("history", noop, interval=60, depends_on=("missing",)))
+    with pytest.raises(ValueError):
+        scheduler.start()
+    assert not scheduler.running
+
+async def test_scheduler_runs_dependencies_first():
+    order = []
+    history_ran = asyncio.Event()
+
+    async def users():
+        await asyncio.sleep(0.02)
+        order.append("users")
+
+    async def history():
+        order.append("history")
+        history_ran.set()
+
+    scheduler = Scheduler()
+    # Registered first, but has to wait for users to succeed
+    scheduler.add_job(Job("history", history, interval=3600, depends_on=("users",)))
+    scheduler.add_job(Job("users", users, interval=3600))
+    scheduler.start()
+    try:
+        await asyncio.wait_for(history_ran.wait(), timeout=1)
+    finally:
+        await scheduler.stop()
+
+    assert order == ["users", "history"]
+
+async def test_scheduler_records_failures_and_retries():
+    attempts = 0
+    succeeded = asyncio.Event()
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise RuntimeError("upstream down")
+        succeeded.set()
+
+    scheduler = Scheduler()
+    job = Job("flaky", flaky, interval=3600, retry_base=0.01, max_backoff=0.02)
+    scheduler.add_job(job)
+    scheduler.start()
+    try:
+        await asyncio.wait_for(succeeded.wait(), timeout=1)
+        # Let _run finish recording the success
+        await asyncio.sleep(0)
+    finally:
+        await scheduler.stop()
+
+    assert attempts == 3
+    assert job.failures == 0
+    assert job.last_error is None
+    assert job.last_success is not None
@@ -0,0 +1,24 @@
+import httpx
+import pytest
+
+from jellynalyst.services.tmdb import TMDBService
+
+def status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.themoviedb.org/3/movie/1")
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+@pytest.mark.parametrize("status", [404, 422])
+def test_unknown_ids_are_permanent_failures(status):
+    assert TMDBService._permanent_failure_reason(status_error(status)) == f"HTTP {status}"
+
+@pytest.mark.parametrize("status", [400, 401, 403, 429, 500, 503])
+def test_other_statuses_are_transient(status):
+    # A bad or revoked API key must not hide every id it touched for days
+    assert TMDBService._permanent_failure_reason(status_error(status)) is None
+
+def test_unparseable_responses_are_permanent():
+    assert TMDBService._permanent_failure_reason(KeyError("id")).startswith("Unparseable response")
+
+def test_network_errors_are_transient():
+    assert TMDBService._permanent_failure_reason(httpx.ConnectError("refused")) is None